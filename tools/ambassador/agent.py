@@ -10,12 +10,27 @@ Identity: @ambassador@slashvibe.dev
 
 import anthropic
 import asyncio
+import heapq
+import itertools
 import json
 import os
+import time
 import httpx
+from answer_cache import AnswerCache, normalize_question
+from knowledge import MAX_SECTION_CHARS, get_knowledge_base
+from memory_store import DB_PATH, MemoryStore, public_record
+from metrics import TOKEN_BUCKETS, Gauge, Histogram
+from polling import AdaptivePoll
+from presence import PresenceCache
+from ratelimit import RateLimiter
+from registry import RegistryClient
+from scheduler import ModelScheduler
+from shared_state import open_state
+from single_flight import SingleFlight
+from tracing import tracer_from_env
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 
 class AmbassadorAgent:
@@ -74,9 +89,21 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
 """
 
     TOOLS = [
+        {
+            "name": "search_knowledge",
+            "description": "Search the knowledge base (spec, integration guides, comparisons, FAQ) and return only the best-matching sections. Prefer this over read_knowledge.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "What you want to know, in a few words"},
+                    "k": {"type": "integer", "description": "How many sections to return (default 3, max 8)"}
+                },
+                "required": ["query"]
+            }
+        },
         {
             "name": "read_knowledge",
-            "description": "Read from knowledge base (spec, integration guides, comparisons, FAQ)",
+            "description": "Read a whole document from the knowledge base (spec, integration guides, comparisons, FAQ)",
             "input_schema": {
                 "type": "object",
                 "properties": {
@@ -102,8 +129,13 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
         },
         {
             "name": "who_online",
-            "description": "See who's currently online on the AIRC network",
-            "input_schema": {"type": "object", "properties": {}}
+            "description": "See who's currently online on the AIRC network, or check whether one handle is online",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "handle": {"type": "string", "description": "Optional: only check this handle"}
+                }
+            }
         },
         {
             "name": "remember",
@@ -130,30 +162,179 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
         }
     ]
 
-    def __init__(self, registry: str = "https://slashvibe.dev"):
-        self.claude = anthropic.Anthropic()
+    # Prompt caching. Tools render before the system prompt, so a single
+    # breakpoint on the system block caches both for every model call.
+    CACHE_CONTROL = {"type": "ephemeral"}
+    SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}]
+
+    # Per-tool timeouts in seconds; others use AMBASSADOR_TOOL_TIMEOUT.
+    # Local lookups should be instant, so a stall there is a bug.
+    TOOL_TIMEOUTS = {
+        "search_knowledge": 5,
+        "read_knowledge": 5,
+        "recall": 5,
+        "remember": 10,
+    }
+
+    # Tools without side effects; consecutive calls to these run together
+    READ_ONLY_TOOLS = {"search_knowledge", "read_knowledge", "who_online", "recall"}
+
+    def __init__(
+        self,
+        registry: str = "https://slashvibe.dev",
+        claude: Optional[anthropic.AsyncAnthropic] = None,
+        inbox_concurrency: Optional[int] = None,
+        memory: Optional[MemoryStore] = None,
+        state=None,
+    ):
+        # Async client so model round-trips never block the event loop
+        # shared with the inbox loop, heartbeats and the web server.
+        self.claude = claude or anthropic.AsyncAnthropic()
         self.registry = registry
-        self.http = httpx.AsyncClient(follow_redirects=True)
+        self.http = RegistryClient()
+
+        # who_online and the welcomer share one short-lived presence list
+        self.presence = PresenceCache(
+            lambda headers: self.http.get(f"{self.registry}/api/presence", headers=headers),
+            ttl=float(os.environ.get("AMBASSADOR_PRESENCE_TTL", 10)),
+        )
         self.token: Optional[str] = None
-        self.memory: dict = {}
+        self.memory = memory or MemoryStore(
+            os.environ.get("AMBASSADOR_MEMORY_DB", DB_PATH),
+            keep_notes=int(os.environ.get("AMBASSADOR_NOTES_KEEP", 8)),
+            max_note_chars=int(os.environ.get("AMBASSADOR_NOTES_MAX_CHARS", 2000)),
+        )
+        self._summarizing: set[str] = set()
+        self._background: set[asyncio.Task] = set()
         self.known_agents: set = set()
         self.last_scan: Optional[datetime] = None
-        self.kb_path = Path(__file__).parent / "knowledge"
+        self.knowledge = get_knowledge_base()
 
-        # Rate limiting: track last response time per sender
-        self.last_response: dict[str, datetime] = {}
-        self.min_response_interval = timedelta(seconds=30)
+        # State every server worker shares: feed, answers, rate limits
+        self.state = state or open_state(self.memory.path)
+
+        # Web chat answers, reused for repeated visitor questions
+        self.answer_cache = AnswerCache(self.knowledge, state=self.state)
+        # Every model call goes through one gate: global cap, inbox first
+        self.scheduler = ModelScheduler(
+            max_concurrent=int(os.environ.get("AMBASSADOR_MODEL_CONCURRENCY", 8))
+        )
+
+        # Identical questions asked while one is being answered share that run
+        self.chat_flights = SingleFlight()
+
+        # Rate limiting: at most one reply per sender every 30s, and an
+        # overall cap on replies per minute across all senders
+        self.reply_limiter = RateLimiter(
+            interval=30,
+            global_interval=60 / float(os.environ.get("AMBASSADOR_REPLIES_PER_MINUTE", 60)),
+            global_burst=10,
+            state=self.state,
+            namespace="reply_limit",
+        )
 
         # Proactive rate limiting: max 1 unsolicited message per day
-        self.last_proactive: dict[str, datetime] = {}
-        self.proactive_cooldown = timedelta(days=1)
+        self.proactive_limiter = RateLimiter(
+            interval=timedelta(days=1).total_seconds(),
+            state=self.state,
+            namespace="proactive_limit",
+        )
 
-        self._load_memory()
+        # Inbox worker pool: different senders are handled in parallel,
+        # messages from the same sender strictly in arrival order.
+        self.inbox_concurrency = inbox_concurrency or int(
+            os.environ.get("AMBASSADOR_INBOX_CONCURRENCY", 4)
+        )
+        self._inbox_slots = asyncio.Semaphore(self.inbox_concurrency)
+        self._sender_queues: dict[str, deque] = {}
+        # Ids queued, deferred or in flight -> registry timestamp
+        self._queued_ids: dict[str, Any] = {}
+        self._inbox_workers: set[asyncio.Task] = set()
+        self._in_flight = 0
+
+        # Incremental inbox fetch: only messages at or after the cursor
+        # (a registry timestamp, persisted in the memory store) are fetched,
+        # in pages of inbox_page_size.
+        self.inbox_page_size = 50
+        self.inbox_max_pages = 20
+        self._cursor: Optional[Any] = None
+        self._saved_cursor: Optional[Any] = None
+        self._cursor_loaded = False
+        # Recently handled ids; `since` is inclusive so the cursor repeats
+        self._recent_ids: OrderedDict[str, None] = OrderedDict()
+        self._last_poll: dict = {}
+
+        # Rate-limited messages wait locally until their sender is eligible:
+        # heap of (loop time when eligible, arrival seq, msg)
+        self._deferred: list = []
+        self._deferred_seq = itertools.count()
+        self._deferred_wake = asyncio.Event()
+        self._deferred_task: Optional[asyncio.Task] = None
+
+        # Messages whose handling failed (e.g. the model was overloaded) stay
+        # tracked, holding the cursor back, and are retried with backoff
+        self.inbox_retry_base = 5.0
+        self.inbox_max_attempts = 5
+
+        # Poll fast after traffic, back off when idle or failing.
+        # With long_poll > 0 the registry may hold each inbox request open
+        # for that many seconds until a message arrives.
+        self.poll = AdaptivePoll(
+            fast=float(os.environ.get("AMBASSADOR_POLL_FAST", 1)),
+            idle_max=float(os.environ.get("AMBASSADOR_POLL_IDLE_MAX", 30)),
+        )
+        self.long_poll = float(os.environ.get("AMBASSADOR_LONG_POLL", 0))
+
+        # Default limit for tools that call the registry (who_online, send_message)
+        self.tool_timeout = float(os.environ.get("AMBASSADOR_TOOL_TIMEOUT", 20))
+
+        # Presence heartbeats run as their own task, on their own interval
+        self.heartbeat_interval = float(os.environ.get("AMBASSADOR_HEARTBEAT_INTERVAL", 30))
+        self._heartbeat = {
+            "sent": 0,
+            "failures": 0,
+            "last_lag_ms": 0.0,
+            "max_lag_ms": 0.0,
+            "last_sent": None,
+        }
+
+        # Token usage per _run_agent call, including prompt-cache reads/writes
+        self.usage_log: deque = deque(maxlen=200)
+        self.usage_totals = {
+            "requests": 0,
+            "model_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
+
+        # Opt-in span trees per handled message (AMBASSADOR_TRACE)
+        self.tracer = tracer_from_env()
+
+        # Per-call model and tool metrics, exported on /metrics
+        self.model_latency = Histogram(
+            "ambassador_model_call_seconds",
+            "Latency of each model call in the agent loop",
+            label="mode",
+        )
+        self.model_tokens = Histogram(
+            "ambassador_model_call_tokens",
+            "Tokens per model call",
+            label="kind",
+            buckets=TOKEN_BUCKETS,
+        )
+        self.tool_latency = Histogram(
+            "ambassador_tool_seconds",
+            "Tool execution latency",
+            label="tool",
+        )
 
     async def start(self):
         """Start the ambassador."""
         try:
             print("🌐 AIRC Ambassador starting...", flush=True)
+            self.knowledge.start_watching()
             await self._register()
             print("✓ Registered as @ambassador", flush=True)
             print("✓ Listening for messages...\n", flush=True)
@@ -171,6 +352,7 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
         )
         await self.http.post(
             f"{self.registry}/api/presence",
+            idempotent=True,
             json={
                 "action": "heartbeat",
                 "username": "ambassador",
@@ -183,86 +365,349 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
         """Main agent loop."""
         loop_count = 0
 
-        # Initial landscape scan
-        if self._should_scan():
-            await self._scan_landscape()
+        # Presence stays up no matter how long inbox work takes
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
 
+        try:
+            # Initial landscape scan
+            if self._should_scan():
+                await self._scan_landscape()
+
+            while True:
+                try:
+                    loop_count += 1
+
+                    # Check and handle messages
+                    found = await self._process_inbox()
+
+                    # API-only mode: no proactive outreach
+                    # Ambassador only responds when contacted
+                    pass
+
+                except Exception as e:
+                    print(f"Loop error: {e}", flush=True)
+                    found = None
+
+                await asyncio.sleep(self.poll.next_delay(found))
+        finally:
+            heartbeat.cancel()
+            await self.stop()
+
+    async def stop(self):
+        """Cancel queued, deferred and in-flight inbox work.
+
+        Called when this worker stops running the agent loop (shutdown or
+        a lost lease). Unfinished messages were never deleted, so whoever
+        runs the loop next fetches and answers them; carrying on here
+        would answer them twice.
+        """
+        tasks = list(self._inbox_workers)
+        if self._deferred_task is not None:
+            tasks.append(self._deferred_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._deferred_task = None
+        self._deferred.clear()
+        self._sender_queues.clear()
+        self._queued_ids.clear()
+        # Resume from the persisted cursor if we lead again
+        self._cursor_loaded = False
+
+    async def _heartbeat_loop(self):
+        """Post a presence heartbeat every heartbeat_interval seconds.
+
+        Beats are scheduled at a fixed rate; lag is how late each one
+        started, which shows when the event loop is starved.
+        """
+        loop = asyncio.get_running_loop()
+        due = loop.time()
         while True:
+            lag_ms = max(0.0, (loop.time() - due) * 1000)
+            self._heartbeat["last_lag_ms"] = round(lag_ms, 1)
+            self._heartbeat["max_lag_ms"] = max(self._heartbeat["max_lag_ms"], round(lag_ms, 1))
             try:
-                loop_count += 1
-
-                # Heartbeat every loop
                 await self.http.post(
                     f"{self.registry}/api/presence",
+                    idempotent=True,
                     json={"action": "heartbeat", "username": "ambassador"}
                 )
+                self._heartbeat["sent"] += 1
+                self._heartbeat["last_sent"] = time.time()
+            except Exception as e:
+                self._heartbeat["failures"] += 1
+                print(f"Heartbeat failed: {e}", flush=True)
+
+            # Skip beats we are already too late for instead of bursting
+            due = max(due + self.heartbeat_interval, loop.time())
+            await asyncio.sleep(due - loop.time())
+
+    def heartbeat_stats(self) -> dict:
+        """Heartbeat counts and lag for /health."""
+        last_sent = self._heartbeat["last_sent"]
+        return {
+            **{k: v for k, v in self._heartbeat.items() if k != "last_sent"},
+            "interval_s": self.heartbeat_interval,
+            "last_sent_age_s": round(time.time() - last_sent, 1) if last_sent else None,
+        }
 
-                # Check and handle messages
-                await self._process_inbox()
+    async def _process_inbox(self) -> Optional[int]:
+        """Fetch messages newer than the cursor and queue them.
 
-                # API-only mode: no proactive outreach
-                # Ambassador only responds when contacted
-                pass
-
-                await asyncio.sleep(5)
+        Returns how many messages were queued, or None if the fetch failed.
+        """
+        with self.tracer.span("inbox.fetch") as span:
+            try:
+                if not self._cursor_loaded:
+                    self._cursor = _parse_cursor(await self.memory.get_meta("inbox_cursor"))
+                    self._saved_cursor = self._cursor
+                    self._cursor_loaded = True
+
+                since = self._cursor
+                newest = self._cursor
+                stats = {"pages": 0, "messages": 0, "bytes": 0, "parse_ms": 0.0}
+                queued = 0
+
+                for page in range(self.inbox_max_pages):
+                    params = {"user": "ambassador", "limit": self.inbox_page_size}
+                    if since is not None:
+                        params["since"] = since
+                    timeout = httpx.USE_CLIENT_DEFAULT
+                    if self.long_poll and page == 0:
+                        # Only the first page waits; later pages are backlog
+                        params["wait"] = self.long_poll
+                        timeout = self.long_poll + 10
+                    resp = await self.http.get(
+                        f"{self.registry}/api/messages", params=params, timeout=timeout
+                    )
+
+                    if resp.status_code != 200:
+                        print(f"Inbox fetch failed: HTTP {resp.status_code}", flush=True)
+                        if span:
+                            span.set(status=resp.status_code)
+                        return None
+
+                    started = time.perf_counter()
+                    data = resp.json()
+                    messages = data.get("inbox", [])
+                    stats["parse_ms"] += (time.perf_counter() - started) * 1000
+                    stats["pages"] += 1
+                    stats["messages"] += len(messages)
+                    stats["bytes"] += len(resp.content)
+
+                    for msg in messages:
+                        newest = _latest(newest, _msg_time(msg))
+                        await self.reply_limiter.load(msg.get("from", "unknown"))
+                        queued += self._accept(msg)
+
+                    # A short page is the end; a full one means more are waiting
+                    if len(messages) < self.inbox_page_size or newest == since:
+                        break
+                    since = newest
+
+                stats["parse_ms"] = round(stats["parse_ms"], 2)
+                self._last_poll = stats
+                self._cursor = newest
+                await self._save_cursor()
+
+                if span:
+                    span.set(pages=stats["pages"], messages=stats["messages"], queued=queued)
+                    if not queued:
+                        span.discard()  # Idle polls would swamp the trace
+                return queued
 
             except Exception as e:
-                print(f"Loop error: {e}", flush=True)
-                await asyncio.sleep(30)
+                print(f"Inbox error: {e}", flush=True)
+                if span:
+                    span.error = str(e)
+                return None
+
+    async def _save_cursor(self):
+        """Persist the cursor, held back to the oldest message not yet handled.
+
+        Queued and deferred messages are still on the registry, so after a
+        restart they are fetched again instead of being skipped.
+        """
+        cursor = _earliest(self._cursor, *self._queued_ids.values())
+        if cursor is not None and cursor != self._saved_cursor:
+            await self.memory.set_meta("inbox_cursor", json.dumps(cursor))
+            self._saved_cursor = cursor
+
+    def _accept(self, msg: dict) -> bool:
+        """Queue one fetched message unless it is a repeat.
+
+        Returns True if it was queued or deferred.
+        """
+        msg_id = msg.get("id")
+
+        # Already queued, deferred, in flight or handled from an earlier poll
+        if msg_id and (msg_id in self._queued_ids or msg_id in self._recent_ids):
+            return False
 
-    async def _process_inbox(self):
-        """Check inbox and process new messages."""
-        try:
-            resp = await self.http.get(
-                f"{self.registry}/api/messages",
-                params={"user": "ambassador"}
-            )
+        self._track(msg)
+        if self.tracer.enabled:
+            # Handled later by a worker; keep the fetch as its parent span
+            msg["_trace"] = self.tracer.current()
+        if self._is_rate_limited(msg.get("from", "unknown")):
+            self._defer(msg)
+        else:
+            self._enqueue(msg)
+        return True
+
+    def _track(self, msg: dict):
+        for msg_id in _message_ids(msg):
+            self._queued_ids[msg_id] = _msg_time(msg)
 
-            if resp.status_code != 200:
-                return
+    def _untrack(self, msg: dict):
+        for msg_id in _message_ids(msg):
+            self._queued_ids.pop(msg_id, None)
 
-            data = resp.json()
-            messages = data.get("inbox", [])
+    def _defer(self, msg: dict, delay: float = 0.0):
+        """Hold a message locally until its sender is eligible and `delay` has passed."""
+        sender = msg.get("from", "unknown")
+        remaining = max(delay, self.reply_limiter.retry_after(sender))
+        # A little slack so the rate limit has surely expired on release
+        eligible_at = asyncio.get_running_loop().time() + remaining + 0.05
+        heapq.heappush(self._deferred, (eligible_at, next(self._deferred_seq), msg))
 
-            for msg in messages:
-                msg_id = msg.get("id")
-                sender = msg.get("from", "unknown")
+        if self._deferred_task is None or self._deferred_task.done():
+            self._deferred_task = asyncio.create_task(self._release_deferred())
+        else:
+            self._deferred_wake.set()
+
+    async def _release_deferred(self):
+        """Move deferred messages to their sender queues as they become eligible.
+
+        Everything a sender sent while rate-limited is coalesced into one
+        message, so a burst costs one model turn instead of one per message.
+        """
+        loop = asyncio.get_running_loop()
+        while self._deferred:
+            wait = self._deferred[0][0] - loop.time()
+            if wait > 0:
+                self._deferred_wake.clear()
+                try:
+                    await asyncio.wait_for(self._deferred_wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
 
-                # Rate limit: skip if we responded to this person recently
-                if self._is_rate_limited(sender):
-                    continue
+            ready: dict[str, list] = {}
+            while self._deferred and self._deferred[0][0] <= loop.time():
+                _, seq, msg = heapq.heappop(self._deferred)
+                ready.setdefault(msg.get("from", "unknown"), []).append((seq, msg))
+            for entries in ready.values():
+                # Arrival order, whatever order they became eligible in
+                self._enqueue(_coalesce([msg for _, msg in sorted(entries, key=lambda e: e[0])]))
 
-                # Process the message
-                await self._handle_message(msg)
+    def _enqueue(self, msg: dict):
+        """Queue a message behind earlier ones from the same sender."""
+        sender = msg.get("from", "unknown")
 
-                # Delete the message after processing
-                await self._delete_message(msg_id)
+        if sender in self._sender_queues:
+            # A worker is already draining this sender; it will pick this up
+            self._sender_queues[sender].append(msg)
+            return
 
-                # Update rate limit tracker
-                self.last_response[sender] = datetime.now()
+        self._sender_queues[sender] = deque([msg])
+        task = asyncio.create_task(self._drain_sender(sender))
+        self._inbox_workers.add(task)
+        task.add_done_callback(self._inbox_workers.discard)
 
-        except Exception as e:
-            print(f"Inbox error: {e}", flush=True)
+    async def _drain_sender(self, sender: str):
+        """Handle one sender's queued messages in order."""
+        queue = self._sender_queues[sender]
+        try:
+            while queue:
+                # Pop only once a slot is free so queue depth counts waiters
+                async with self._inbox_slots:
+                    msg = queue.popleft()
+                    self._in_flight += 1
+                    done = True
+                    try:
+                        # Replied to this sender moments ago: wait locally
+                        if self._is_rate_limited(sender):
+                            self._defer(msg)
+                            done = False
+                            continue
+
+                        with self.tracer.span(
+                            "inbox.message", parent=msg.get("_trace"),
+                            sender=sender, messages=len(_message_ids(msg)),
+                        ):
+                            # Process the message
+                            await self._handle_message(msg)
+
+                            # Delete the message(s) after processing
+                            for msg_id in _message_ids(msg):
+                                await self._delete_message(msg_id)
+
+                        # Update rate limit tracker
+                        self.reply_limiter.hit(sender)
+
+                        for msg_id in _message_ids(msg):
+                            self._recent_ids[msg_id] = None
+                        while len(self._recent_ids) > 1000:
+                            self._recent_ids.popitem(last=False)
+
+                    except Exception as e:
+                        print(f"Inbox error: {e}", flush=True)
+                        done = not self._retry(msg)
+                    finally:
+                        self._in_flight -= 1
+                        if done:
+                            self._untrack(msg)
+        finally:
+            del self._sender_queues[sender]
+
+    def _retry(self, msg: dict) -> bool:
+        """Defer a message whose handling failed, with exponential backoff.
+
+        Returns False once it is out of attempts; it is then left on the
+        registry and the cursor moves past it.
+        """
+        attempts = msg.get("_attempts", 0) + 1
+        if attempts >= self.inbox_max_attempts:
+            print(f"Giving up on {', '.join(_message_ids(msg))} after {attempts} attempts", flush=True)
+            return False
+        msg["_attempts"] = attempts
+        self._defer(msg, delay=self.inbox_retry_base * 2 ** (attempts - 1))
+        return True
+
+    def inbox_stats(self) -> dict:
+        """Queue depth and in-flight counts for the inbox worker pool."""
+        return {
+            "queue_depth": sum(len(q) for q in self._sender_queues.values()),
+            "in_flight": self._in_flight,
+            "deferred": len(self._deferred),
+            "rate_limit": self.reply_limiter.stats(),
+            "active_senders": len(self._sender_queues),
+            "concurrency": self.inbox_concurrency,
+            "cursor": self._cursor,
+            "last_poll": self._last_poll,
+            "poll": self.poll.stats(),
+        }
 
     def _is_rate_limited(self, sender: str) -> bool:
         """Check if we should rate-limit responses to this sender."""
-        if sender not in self.last_response:
-            return False
-        elapsed = datetime.now() - self.last_response[sender]
-        return elapsed < self.min_response_interval
+        return not self.reply_limiter.allowed(sender)
 
     async def _delete_message(self, msg_id: str):
         """Delete a message after processing."""
         if not msg_id:
             return
-        try:
-            await self.http.request(
-                "DELETE",
-                f"{self.registry}/api/messages",
-                json={"user": "ambassador", "messageId": msg_id}
-            )
-        except:
-            pass  # Non-critical
+        with self.tracer.span("delete_message", message_id=msg_id) as span:
+            try:
+                resp = await self.http.request(
+                    "DELETE",
+                    f"{self.registry}/api/messages",
+                    json={"user": "ambassador", "messageId": msg_id}
+                )
+                if span:
+                    span.set(status=resp.status_code)
+            except:
+                pass  # Non-critical
 
     async def _handle_message(self, msg: dict):
         """Handle an incoming message."""
@@ -272,69 +717,233 @@ Be genuinely helpful to agents and developers exploring AIRC. Listen first. Don'
         if not body:
             return
 
-        print(f"📨 @{sender}: {body[:60]}{'...' if len(body) > 60 else ''}", flush=True)
+        with self.tracer.span("handle_message", sender=sender, chars=len(body)):
+            print(f"📨 @{sender}: {body[:60]}{'...' if len(body) > 60 else ''}", flush=True)
 
-        # Get conversation context
-        history = self.memory.get(sender, {})
-        recent_notes = history.get("notes", "No previous interaction")
+            # Get conversation context
+            history = await self.memory.get(sender) or {}
+            recent_notes = history.get("notes", "No previous interaction")
 
-        # Build prompt with context
-        prompt = f"""Message from @{sender}:
+            # Build prompt with context
+            prompt = f"""Message from @{sender}:
 
 "{body}"
 
 Context about @{sender}: {recent_notes}
 
-Respond helpfully and concisely. If they need code, use read_knowledge to get examples.
+Respond helpfully and concisely. If they need code, use search_knowledge to get examples.
 After responding, use the remember tool to note any important details about this conversation."""
 
-        # Generate response
-        response = await self._run_agent(prompt)
-
-        # Send response
-        if response:
-            await self._send("ambassador", sender, response)
-            print(f"✓ Replied to @{sender}", flush=True)
-
-    async def _run_agent(self, prompt: str) -> str:
-        """Run Claude agent loop with tools."""
+            # Generate response
+            response = await self._run_agent(prompt)
+
+            # Send response
+            if response:
+                await self._send("ambassador", sender, response)
+                print(f"✓ Replied to @{sender}", flush=True)
+
+    async def _run_agent(
+        self,
+        prompt: str,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        priority: str = "inbox",
+    ) -> str:
+        """Run Claude agent loop with tools.
+
+        With `on_delta`, every model turn is streamed and each text delta is
+        passed to it as it arrives, including text from tool-use turns.
+        Model calls are scheduled at `priority`; if the first one can't be
+        admitted this raises scheduler.Busy before any work is done.
+        """
         messages = [{"role": "user", "content": prompt}]
+        usage = {key: 0 for key in self.usage_totals if key != "requests"}
+
+        with self.tracer.span("agent.run") as run:
+            try:
+                for iteration in range(10):  # Max 10 tool calls
+                    request = dict(
+                        model="claude-sonnet-4-20250514",
+                        max_tokens=2048,
+                        system=self.SYSTEM,
+                        tools=self.TOOLS,
+                        messages=self._with_cache_breakpoint(messages)
+                    )
+
+                    mode = "stream" if on_delta else "create"
+                    # Only admission can be refused; an admitted run finishes
+                    async with self.scheduler.slot(priority, reject=iteration == 0):
+                        with self.tracer.span("model.call", iteration=iteration, mode=mode) as span:
+                            started = time.perf_counter()
+                            if on_delta:
+                                async with self.claude.messages.stream(**request) as stream:
+                                    async for text in stream.text_stream:
+                                        await on_delta(text)
+                                    response = await stream.get_final_message()
+                            else:
+                                response = await self.claude.messages.create(**request)
+                            self.model_latency.observe(time.perf_counter() - started, mode)
+                            if span:
+                                reported = getattr(response, "usage", None)
+                                span.set(
+                                    stop_reason=response.stop_reason,
+                                    input_tokens=getattr(reported, "input_tokens", None) or 0,
+                                    output_tokens=getattr(reported, "output_tokens", None) or 0,
+                                )
+
+                    self._add_usage(usage, response)
+                    self._observe_tokens(response)
+
+                    if response.stop_reason == "end_turn":
+                        for block in response.content:
+                            if hasattr(block, 'text'):
+                                return block.text
+                        return ""
+
+                    if response.stop_reason == "tool_use":
+                        tool_results = await self._run_tools(
+                            [block for block in response.content if block.type == "tool_use"]
+                        )
+                        messages.append({"role": "assistant", "content": response.content})
+                        messages.append({"role": "user", "content": tool_results})
+                    else:
+                        break
+                else:
+                    if run:
+                        run.set(hit_iteration_cap=True)
 
-        for _ in range(10):  # Max 10 tool calls
-            response = self.claude.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2048,
-                system=self.SYSTEM_PROMPT,
-                tools=self.TOOLS,
-                messages=messages
-            )
-
-            if response.stop_reason == "end_turn":
-                for block in response.content:
-                    if hasattr(block, 'text'):
-                        return block.text
                 return ""
+            finally:
+                if run:
+                    run.set(model_calls=usage["model_calls"])
+                self._record_usage(usage)
+
+    def _with_cache_breakpoint(self, messages: list) -> list:
+        """Mark the latest tool results cacheable so the next turn reuses them.
+
+        Only the newest user turn carries a breakpoint (the API allows four),
+        and the first turn is left alone since most answers end there.
+        """
+        if len(messages) < 2:
+            return messages
+        last = messages[-1]
+        content = list(last["content"])
+        content[-1] = {**content[-1], "cache_control": self.CACHE_CONTROL}
+        return messages[:-1] + [{**last, "content": content}]
+
+    @staticmethod
+    def _add_usage(usage: dict, response):
+        """Accumulate token counts from one model response."""
+        usage["model_calls"] += 1
+        reported = getattr(response, "usage", None)
+        for key in usage:
+            if key != "model_calls":
+                usage[key] += getattr(reported, key, None) or 0
+
+    def _observe_tokens(self, response):
+        """Record the token counts of one model call."""
+        reported = getattr(response, "usage", None)
+        for kind in ("input_tokens", "output_tokens",
+                     "cache_read_input_tokens", "cache_creation_input_tokens"):
+            self.model_tokens.observe(getattr(reported, kind, None) or 0, kind.removesuffix("_tokens"))
+
+    def metrics(self) -> list:
+        """Metrics for /metrics: model, tool, registry and inbox."""
+        return [
+            self.model_latency,
+            self.model_tokens,
+            self.tool_latency,
+            *self.http.metrics(),
+            Gauge(
+                "ambassador_model_calls_active",
+                "Model calls holding a scheduler slot",
+                fn=self.scheduler.active,
+            ),
+            Gauge(
+                "ambassador_model_calls_waiting",
+                "Model calls waiting for a scheduler slot",
+                label="priority",
+                fn=self.scheduler.waiting,
+            ),
+            self.scheduler.rejected,
+            Gauge(
+                "ambassador_inbox_queue_depth",
+                "Inbox messages queued per sender, waiting for a worker",
+                fn=lambda: sum(len(q) for q in self._sender_queues.values()),
+            ),
+            Gauge(
+                "ambassador_inbox_in_flight",
+                "Inbox messages being handled",
+                fn=lambda: self._in_flight,
+            ),
+            Gauge(
+                "ambassador_inbox_deferred",
+                "Rate-limited inbox messages held locally",
+                fn=lambda: len(self._deferred),
+            ),
+        ]
 
-            if response.stop_reason == "tool_use":
-                tool_results = []
-                for block in response.content:
-                    if block.type == "tool_use":
-                        result = await self._tool(block.name, block.input)
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": str(result)
-                        })
-                messages.append({"role": "assistant", "content": response.content})
-                messages.append({"role": "user", "content": tool_results})
-            else:
-                break
+    def _record_usage(self, usage: dict):
+        """Log one request's token usage and add it to the running totals."""
+        if not usage["model_calls"]:
+            return
+        self.usage_log.append({"at": datetime.now().isoformat(), **usage})
+        self.usage_totals["requests"] += 1
+        for key, value in usage.items():
+            self.usage_totals[key] += value
+        print(
+            f"🪙 {usage['model_calls']} calls, in={usage['input_tokens']} "
+            f"out={usage['output_tokens']} cache_read={usage['cache_read_input_tokens']} "
+            f"cache_write={usage['cache_creation_input_tokens']}",
+            flush=True
+        )
 
-        return ""
+    async def _run_tools(self, blocks: list) -> list:
+        """Run one turn's tool_use blocks, returning results in block order.
+
+        Consecutive read-only lookups run together. Tools with side effects
+        (send_message, remember) run alone and in the order the model asked,
+        so messages arrive in order and a recall sees an earlier remember.
+        """
+        results = []
+        lookups = []
+        for block in blocks:
+            if block.name in self.READ_ONLY_TOOLS:
+                lookups.append(block)
+                continue
+            results += await asyncio.gather(*map(self._run_tool, lookups))
+            lookups = []
+            results.append(await self._run_tool(block))
+        results += await asyncio.gather(*map(self._run_tool, lookups))
+        return results
+
+    async def _run_tool(self, block) -> dict:
+        """Run one tool_use block under its timeout, as a tool_result.
+
+        Failures and timeouts become error results for the model to see,
+        so one bad call doesn't sink the others or the whole reply.
+        """
+        timeout = self.TOOL_TIMEOUTS.get(block.name, self.tool_timeout)
+        result = {"type": "tool_result", "tool_use_id": block.id}
+        with self.tracer.span(f"tool.{block.name}") as span:
+            started = time.perf_counter()
+            try:
+                result["content"] = str(await asyncio.wait_for(self._tool(block.name, block.input), timeout))
+            except asyncio.TimeoutError:
+                result.update(content=f"{block.name} timed out after {timeout:g}s", is_error=True)
+            except Exception as e:
+                print(f"Tool {block.name} failed: {e}", flush=True)
+                result.update(content=f"{block.name} failed: {e}", is_error=True)
+            self.tool_latency.observe(time.perf_counter() - started, block.name)
+            if span and result.get("is_error"):
+                span.error = result["content"]
+        return result
 
     async def _tool(self, name: str, input: dict) -> Any:
         """Execute a tool."""
-        if name == "read_knowledge":
+        if name == "search_knowledge":
+            return self._search_kb(input.get("query", ""), input.get("k", 3))
+
+        elif name == "read_knowledge":
             return self._read_kb(input.get("topic", "spec"))
 
         elif name == "send_message":
@@ -342,73 +951,91 @@ After responding, use the remember tool to note any important details about this
             return "Message sent"
 
         elif name == "who_online":
-            resp = await self.http.get(f"{self.registry}/api/presence")
-            if resp.status_code == 200:
-                data = resp.json()
-                active = data.get("active", [])
-                return [a.get("username") for a in active[:20]]
-            return []
+            if input.get("handle"):
+                entry = await self.presence.lookup(input["handle"])
+                return entry or f"@{input['handle']} is not online"
+            snapshot = await self.presence.get()
+            return [a.get("username") for a in snapshot.active[:20]]
 
         elif name == "remember":
             handle = input["handle"]
-            note = input["note"]
-            self.memory.setdefault(handle, {})
-            existing = self.memory[handle].get("notes", "")
-            # Append new notes
-            timestamp = datetime.now().strftime("%Y-%m-%d")
-            new_note = f"[{timestamp}] {note}"
-            self.memory[handle]["notes"] = f"{existing}\n{new_note}".strip()
-            self.memory[handle]["last_interaction"] = datetime.now().isoformat()
-            self._save_memory()
+            record = await self.memory.remember(handle, input["note"])
+            # Summarize once folded notes outgrow a third of the budget
+            if (record.get("summary_pending")
+                    and len(record["summary"]) > self.memory.max_note_chars // 3
+                    and handle not in self._summarizing):
+                self._spawn(self._refresh_summary(handle, record["summary"]))
             return "Remembered"
 
         elif name == "recall":
             handle = input["handle"]
-            return self.memory.get(handle, {"notes": "No previous interactions"})
+            record = await self.memory.get(handle)
+            return public_record(record) if record else {"notes": "No previous interactions"}
 
         return "Unknown tool"
 
-    async def _send(self, from_: str, to: str, text: str):
-        """Send an AIRC message."""
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference to it."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _refresh_summary(self, handle: str, summary: str):
+        """Have the model rewrite a handle's folded notes as a short summary."""
+        self._summarizing.add(handle)
+        budget = self.memory.max_note_chars // 3
         try:
-            await self.http.post(
-                f"{self.registry}/api/messages",
-                json={"from": from_, "to": to, "text": text}
-            )
+            async with self.scheduler.slot("background", reject=False):
+                response = await self.claude.messages.create(
+                    model="claude-sonnet-4-20250514",
+                    max_tokens=400,
+                    messages=[{"role": "user", "content": f"""Condense these notes about @{handle} into at most {budget} characters.
+Keep who they are, what they care about and how to approach them. Reply with the summary only.
+
+{summary}"""}]
+                )
+            text = next((b.text for b in response.content if hasattr(b, "text")), "")
+            if text:
+                await self.memory.set_summary(handle, text[:budget], replaces=summary)
         except Exception as e:
-            print(f"Send failed: {e}", flush=True)
+            print(f"Summary refresh failed for @{handle}: {e}", flush=True)
+        finally:
+            self._summarizing.discard(handle)
+
+    async def _send(self, from_: str, to: str, text: str):
+        """Send an AIRC message."""
+        with self.tracer.span("send", to=to, chars=len(text)) as span:
+            try:
+                resp = await self.http.post(
+                    f"{self.registry}/api/messages",
+                    json={"from": from_, "to": to, "text": text}
+                )
+                if span:
+                    span.set(status=resp.status_code)
+            except Exception as e:
+                print(f"Send failed: {e}", flush=True)
+                if span:
+                    span.error = str(e)
 
     def _read_kb(self, topic: str) -> str:
         """Read from knowledge base."""
-        files = {
-            "spec": "spec/SPEC.md",
-            "python": "integration/PYTHON.md",
-            "typescript": "integration/TYPESCRIPT.md",
-            "mcp": "integration/MCP.md",
-            "vs_a2a": "comparison/VS_A2A.md",
-            "vs_ucp": "comparison/VS_UCP.md",
-            "faq": "faq/FAQ.md",
-            "spirit": "faq/SPIRIT.md"
-        }
-
-        path = self.kb_path / files.get(topic, "spec/SPEC.md")
-        try:
-            return path.read_text()[:6000]
-        except:
+        text = self.knowledge.read_topic(topic)
+        if text is None:
             return f"Knowledge not found for: {topic}"
-
-    def _load_memory(self):
-        """Load memory from disk."""
-        path = Path(__file__).parent / "memory.json"
-        try:
-            self.memory = json.loads(path.read_text())
-        except:
-            self.memory = {}
-
-    def _save_memory(self):
-        """Save memory to disk."""
-        path = Path(__file__).parent / "memory.json"
-        path.write_text(json.dumps(self.memory, indent=2))
+        if len(text) > 6000:
+            return text[:6000] + "\n\n[Truncated. Use search_knowledge for specific sections.]"
+        return text
+
+    def _search_kb(self, query: str, k: int = 3) -> str:
+        """Return the knowledge sections that best match a query."""
+        k = max(1, min(int(k), 8))
+        sections = self.knowledge.search(query, k)
+        if not sections:
+            return f"No knowledge sections match: {query}"
+        return "\n\n".join(
+            f"[{s.path} > {s.heading}]\n{s.text[:MAX_SECTION_CHARS]}" for s in sections
+        )
 
     # ─────────────────────────────────────────────────────────────────
     # Proactive Features
@@ -417,31 +1044,22 @@ After responding, use the remember tool to note any important details about this
     async def _welcome_new_agents(self):
         """Check for new agents and welcome them (max 1/day)."""
         try:
-            resp = await self.http.get(f"{self.registry}/api/presence")
-            if resp.status_code != 200:
-                return
-
-            data = resp.json()
-            # Handle both list format and dict format
-            if isinstance(data, dict):
-                active = data.get("active", []) + data.get("systemAccounts", [])
-            else:
-                active = data
-
-            for agent in active:
+            snapshot = await self.presence.get()
+
+            for agent in snapshot.everyone:
                 handle = agent.get("username") or agent.get("handle")
                 if not handle or handle == "ambassador":
                     continue
 
                 # Skip if we've welcomed them before (ever)
-                if handle in self.memory:
+                if await self.memory.contains(handle):
                     self.known_agents.add(handle)
                     continue
 
                 # Skip if we've sent ANY proactive message in last 24h
-                if handle in self.last_proactive:
-                    if datetime.now() - self.last_proactive[handle] < self.proactive_cooldown:
-                        continue
+                await self.proactive_limiter.load(handle)
+                if not self.proactive_limiter.allowed(handle):
+                    continue
 
                 # Skip if already in known_agents this session
                 if handle in self.known_agents:
@@ -450,7 +1068,7 @@ After responding, use the remember tool to note any important details about this
                 # New agent - send welcome (but only one per day globally)
                 await self._send_welcome(handle, agent)
                 self.known_agents.add(handle)
-                self.last_proactive[handle] = datetime.now()
+                self.proactive_limiter.hit(handle)
 
                 # Only welcome ONE agent per check cycle to avoid spam
                 break
@@ -475,12 +1093,11 @@ Here if you ever have questions about the protocol. No pressure - just wanted to
         await self._send("ambassador", handle, welcome)
 
         # Remember them
-        self.memory[handle] = {
+        await self.memory.put(handle, {
             "notes": f"New agent. Working on: {context or 'unknown'}. Welcomed {datetime.now().date()}",
             "welcomed": datetime.now().isoformat(),
             "relationship": "new"
-        }
-        self._save_memory()
+        })
 
         print(f"👋 Welcomed @{handle}", flush=True)
 
@@ -505,6 +1122,7 @@ Here if you ever have questions about the protocol. No pressure - just wanted to
             try:
                 resp = await self.http.get(
                     f"https://api.github.com/repos/{repo}/releases",
+                    endpoint="GET github releases",
                     headers={"Accept": "application/vnd.github.v3+json"}
                 )
                 if resp.status_code == 200:
@@ -531,12 +1149,77 @@ Should I analyze any of these for AIRC relevance?"""
         print("✓ Landscape scan complete", flush=True)
 
 
+# ─────────────────────────────────────────────────────────────────
+# Inbox cursor helpers
+# ─────────────────────────────────────────────────────────────────
+
+def _msg_time(msg: dict) -> Any:
+    """A message's registry timestamp (ISO string or epoch number), if any."""
+    for key in ("timestamp", "createdAt", "created_at"):
+        if msg.get(key) is not None:
+            return msg[key]
+    return None
+
+
+def _message_ids(msg: dict) -> list:
+    """Registry ids behind a message (several if it was coalesced)."""
+    return msg.get("ids") or ([msg["id"]] if msg.get("id") else [])
+
+
+def _coalesce(msgs: list) -> dict:
+    """Merge messages from one sender into a single message, oldest first."""
+    if len(msgs) == 1:
+        return msgs[0]
+    return {
+        **msgs[0],
+        "ids": [msg_id for m in msgs for msg_id in _message_ids(m)],
+        "text": "\n\n".join(m.get("text", "") for m in msgs if m.get("text")),
+    }
+
+
+def _order_key(value: Any):
+    # Numbers sort numerically, ISO strings lexicographically
+    return (0, float(value), "") if isinstance(value, (int, float)) else (1, 0.0, str(value))
+
+
+def _earliest(*values: Any) -> Any:
+    present = [v for v in values if v is not None]
+    return min(present, key=_order_key) if present else None
+
+
+def _latest(*values: Any) -> Any:
+    present = [v for v in values if v is not None]
+    return max(present, key=_order_key) if present else None
+
+
+def _parse_cursor(raw: Optional[str]) -> Any:
+    try:
+        return json.loads(raw) if raw else None
+    except ValueError:
+        return None
+
+
 # ─────────────────────────────────────────────────────────────────
 # Web Interface
 # ─────────────────────────────────────────────────────────────────
 
-async def handle_web_chat(message: str, agent: AmbassadorAgent) -> str:
-    """Handle a web chat message (from airc.chat widget)."""
+async def handle_web_chat(
+    message: str,
+    agent: AmbassadorAgent,
+    on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> str:
+    """Handle a web chat message (from airc.chat widget).
+
+    Pass `on_delta` to receive the answer incrementally as it is generated.
+    Repeated questions are answered from `agent.answer_cache`, and ones
+    arriving while the same question is being answered wait for that run.
+    """
+    cached = await agent.answer_cache.fetch(message)
+    if cached is not None:
+        if on_delta:
+            await on_delta(cached)
+        return cached
+
     prompt = f"""Web visitor asks:
 
 "{message}"
@@ -545,7 +1228,16 @@ This is someone visiting airc.chat. Be welcoming and helpful.
 Explain AIRC simply. Offer code examples if they're a developer.
 Keep your response concise and friendly."""
 
-    return await agent._run_agent(prompt)
+    async def answer(on_delta):
+        result = await agent._run_agent(prompt, on_delta=on_delta, priority="web")
+        agent.answer_cache.put(message, result)
+        return result
+
+    key = normalize_question(message)
+    if not key:
+        # Only emoji or punctuation: nothing says two of these are the same question
+        return await answer(on_delta)
+    return await agent.chat_flights.run(key, answer, on_delta)
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -555,6 +1247,7 @@ Keep your response concise and friendly."""
 async def interactive_mode():
     """Run in interactive mode for testing."""
     agent = AmbassadorAgent()
+    agent.knowledge.start_watching()
     print("🌐 AIRC Ambassador (interactive mode)")
     print("Type messages to test. Ctrl+C to exit.\n")
 
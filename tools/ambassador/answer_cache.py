@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Answer Cache
+
+LRU + TTL cache of web chat answers, keyed on normalized questions so
+"What is AIRC?", "what is airc" and "What is AIRC ?!" share one entry.
+Entries are dropped whenever the knowledge base changes.
+
+With a shared-state backend, answers are also written there (in the
+background) and fetch() looks local misses up there, so every server
+worker benefits from an answer any of them computed. Shared keys include
+the knowledge base fingerprint, so answers from older knowledge are
+never served.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from knowledge import KnowledgeBase
+from shared_state import shared_get, shared_set
+
+
+def normalize_question(question: str) -> str:
+    """Fold case, punctuation and whitespace so close variants match."""
+    words = re.sub(r"[^\w\s]", " ", question.lower()).split()
+    return " ".join(words)
+
+
+class AnswerCache:
+    """Least-recently-used answer cache with per-entry expiry."""
+
+    def __init__(
+        self,
+        knowledge: KnowledgeBase,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        state=None,
+    ):
+        self.knowledge = knowledge
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.state = state
+
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._generation = knowledge.generation
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, question: str) -> Optional[str]:
+        """Return a fresh locally cached answer, or None."""
+        answer = self._get_local(normalize_question(question))
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return answer
+
+    async def fetch(self, question: str) -> Optional[str]:
+        """get(), falling back to answers other workers put in the shared state."""
+        key = normalize_question(question)
+        answer = self._get_local(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+
+        if self.state is not None and key:
+            answer = await shared_get(self.state, "answers", self._shared_key(key))
+        if answer is None:
+            self.misses += 1
+            return None
+        # Another worker answered this: keep it locally from now on
+        self._store(key, answer)
+        self.shared_hits += 1
+        return answer
+
+    def put(self, question: str, answer: str):
+        """Cache an answer, evicting the least recently used entry if full."""
+        key = normalize_question(question)
+        if not key or not answer:
+            return
+        self._store(key, answer)
+        if self.state is not None:
+            shared_set(self.state, "answers", self._shared_key(key), answer, ttl=self.ttl)
+
+    def _get_local(self, key: str) -> Optional[str]:
+        self._check_knowledge()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: str, answer: str):
+        self._entries[key] = (time.monotonic() + self.ttl, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.knowledge.fingerprint}:{key}"
+
+    def clear(self):
+        """Drop every locally cached answer (shared ones are keyed by knowledge fingerprint)."""
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit/miss counters for /health."""
+        hits = self.hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _check_knowledge(self):
+        """Invalidate everything if the knowledge base reloaded."""
+        if self.knowledge.generation != self._generation:
+            self._generation = self.knowledge.generation
+            self.clear()
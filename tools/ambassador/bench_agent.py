@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Agent benchmark: inbox throughput and chat latency, fully offline
+
+Runs the real AmbassadorAgent and server app against a local stub
+registry (/api/messages, /api/presence, /api/identity) and a deterministic
+fake model with configurable latency and tool-use pattern. Nothing leaves
+the process, so results only move when our own code does.
+
+Reports, per concurrency level:
+- inbox throughput (messages/s) and p50/p99 reply latency, measured from
+  the poll that first returned a message to the reply being posted
+- /api/chat p50/p99 latency with that many visitors asking at once
+
+Usage:
+  python bench_agent.py                        # default levels 1,4,8
+  python bench_agent.py --concurrency 1,2,4,8,16 --messages 128
+  python bench_agent.py --latency 0.2 --tools search_knowledge,remember
+  python bench_agent.py --json                 # machine-readable
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import random
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+from agent import AmbassadorAgent
+from memory_store import MemoryStore
+from ratelimit import RateLimiter
+from registry import RegistryClient
+
+
+# Arguments the fake model passes to each tool it "decides" to call
+TOOL_INPUTS = {
+    "search_knowledge": {"query": "How does presence work?"},
+    "read_knowledge": {"topic": "faq"},
+    "who_online": {},
+    "recall": {"handle": "{sender}"},
+    "remember": {"handle": "{sender}", "note": "Asked about presence"},
+}
+
+
+# ─────────────────────────────────────────────────────────────────
+# Fake model
+# ─────────────────────────────────────────────────────────────────
+
+class FakeModel:
+    """Deterministic stand-in for `AsyncAnthropic()`.
+
+    Every turn sleeps `latency` seconds (± `jitter`, from a seeded RNG).
+    `tool_rounds` is the tool-use pattern: turn i asks for the tools in
+    `tool_rounds[i]`, and the turn after the last round ends with `reply`.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0,
+                 tool_rounds: list = None, reply: str = "AIRC is the social layer for agents.",
+                 seed: int = 0):
+        self.messages = FakeMessages(latency, jitter, tool_rounds or [], reply, seed)
+
+
+class FakeMessages:
+    def __init__(self, latency: float, jitter: float, tool_rounds: list, reply: str, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.tool_rounds = tool_rounds
+        self.reply = reply
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _response(self, request: dict):
+        self.calls += 1
+        messages = request["messages"]
+        turn = len(messages) // 2  # user, (assistant, user)*
+        usage = SimpleNamespace(input_tokens=1200, output_tokens=80,
+                                cache_read_input_tokens=1000 if turn else 0,
+                                cache_creation_input_tokens=0)
+        if turn < len(self.tool_rounds):
+            sender = _sender_of(messages[0]["content"])
+            content = [
+                SimpleNamespace(type="tool_use", id=f"toolu_{turn}_{i}", name=name,
+                                input=_tool_input(name, sender))
+                for i, name in enumerate(self.tool_rounds[turn])
+            ]
+            return SimpleNamespace(stop_reason="tool_use", content=content, usage=usage)
+        return SimpleNamespace(
+            stop_reason="end_turn",
+            content=[SimpleNamespace(type="text", text=self.reply)],
+            usage=usage,
+        )
+
+    async def create(self, **request):
+        await asyncio.sleep(self._delay())
+        return self._response(request)
+
+    def stream(self, **request):
+        return FakeStream(self, request)
+
+
+class FakeStream:
+    """Mimics `messages.stream(...)`: the reply arrives word by word."""
+
+    def __init__(self, messages: FakeMessages, request: dict):
+        self.messages = messages
+        self.request = request
+        self.final = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        delay = self.messages._delay()
+        self.final = self.messages._response(self.request)
+        text = next((b.text for b in self.final.content if hasattr(b, "text")), "")
+        words = text.split(" ") if text else []
+        if not words:
+            await asyncio.sleep(delay)
+        for i, word in enumerate(words):
+            await asyncio.sleep(delay / len(words))
+            yield word if i == 0 else " " + word
+
+    async def get_final_message(self):
+        if self.final is None:
+            async for _ in self.text_stream:
+                pass
+        return self.final
+
+
+def _sender_of(prompt: str) -> str:
+    if prompt.startswith("Message from @"):
+        return prompt[len("Message from @"):].split(":", 1)[0]
+    return "web_visitor"
+
+
+def _tool_input(name: str, sender: str) -> dict:
+    return {k: v.replace("{sender}", sender) for k, v in TOOL_INPUTS.get(name, {}).items()}
+
+
+# ─────────────────────────────────────────────────────────────────
+# Stub registry
+# ─────────────────────────────────────────────────────────────────
+
+class StubRegistry:
+    """In-process AIRC registry for httpx.MockTransport.
+
+    Records when each message was first handed to the agent and when each
+    reply was posted, so reply latency can be computed per message.
+    """
+
+    def __init__(self, inbox: list, online: int = 25, latency: float = 0.0):
+        self.inbox = list(inbox)
+        self.latency = latency
+        self.fetched_at: dict[str, float] = {}
+        self.replies: dict[str, list[float]] = defaultdict(list)
+        self.deleted = 0
+        self.requests: dict[str, int] = defaultdict(int)
+        self.presence = {
+            "active": [{"username": f"agent{i}", "status": "available"} for i in range(online)],
+            "system": [],
+        }
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.url.path
+        self.requests[f"{request.method} {path}"] += 1
+
+        if path == "/api/messages":
+            if request.method == "GET":
+                since = request.url.params.get("since")
+                limit = int(request.url.params.get("limit", 10**6))
+                page = [m for m in self.inbox if since is None or m["timestamp"] >= int(since)][:limit]
+                now = time.perf_counter()
+                for m in page:
+                    self.fetched_at.setdefault(m["id"], now)
+                return httpx.Response(200, json={"inbox": page})
+            if request.method == "POST":
+                sent = json.loads(request.content)
+                self.replies[sent["to"]].append(time.perf_counter())
+                return httpx.Response(200, json={"ok": True})
+            if request.method == "DELETE":
+                msg_id = json.loads(request.content)["messageId"]
+                self.inbox = [m for m in self.inbox if m["id"] != msg_id]
+                self.deleted += 1
+                return httpx.Response(200, json={"ok": True})
+
+        if path == "/api/presence":
+            if request.method == "GET":
+                return httpx.Response(200, json=self.presence, headers={"ETag": '"presence-1"'})
+            return httpx.Response(200, json={"ok": True})
+
+        if path == "/api/identity":
+            return httpx.Response(200, json={"ok": True, "handle": "ambassador"})
+
+        return httpx.Response(404, json={"error": "not found"})
+
+
+def make_inbox(count: int, senders: int) -> list:
+    """`count` messages spread round-robin over `senders` handles."""
+    return [
+        {"id": f"m{i}", "from": f"agent{i % senders}", "text": f"Question {i} about AIRC", "timestamp": i}
+        for i in range(count)
+    ]
+
+
+def make_agent(model: FakeModel, registry: StubRegistry, concurrency: int, memory_path: str) -> AmbassadorAgent:
+    agent = AmbassadorAgent(
+        registry="http://registry.bench", claude=model,
+        inbox_concurrency=concurrency, memory=MemoryStore(memory_path),
+    )
+    agent.http = RegistryClient(transport=registry.transport)
+    # Measure the pipeline, not the 30s per-sender politeness limit
+    agent.reply_limiter = RateLimiter(interval=0)
+    return agent
+
+
+# ─────────────────────────────────────────────────────────────────
+# Benchmarks
+# ─────────────────────────────────────────────────────────────────
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile (q in 0..1) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+async def bench_inbox(concurrency: int, messages: int = 64, senders: int = 16,
+                      latency: float = 0.05, tool_rounds: list = None) -> dict:
+    """Handle `messages` inbox messages with `concurrency` workers."""
+    registry = StubRegistry(make_inbox(messages, senders))
+    model = FakeModel(latency=latency, tool_rounds=tool_rounds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = make_agent(model, registry, concurrency, str(Path(tmp) / "memory.db"))
+        await agent._register()
+
+        # One poll pages through the whole backlog (up to 1000 messages)
+        started = time.perf_counter()
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+        elapsed = time.perf_counter() - started
+        await agent.http.aclose()
+        agent.memory.close()
+
+    # Replies to one sender go out in arrival order
+    latencies = []
+    by_sender = defaultdict(list)
+    for msg in make_inbox(messages, senders):
+        by_sender[msg["from"]].append(registry.fetched_at[msg["id"]])
+    for sender, fetched in by_sender.items():
+        latencies += [sent - got for got, sent in zip(fetched, registry.replies[sender])]
+
+    return {
+        "concurrency": concurrency,
+        "messages": messages,
+        "replied": sum(len(r) for r in registry.replies.values()),
+        "model_calls": model.messages.calls,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(messages / elapsed, 2),
+        "reply_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "reply_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+async def bench_chat(concurrency: int, requests: int = 32, latency: float = 0.05,
+                     tool_rounds: list = None) -> dict:
+    """POST /api/chat `requests` times, `concurrency` visitors at a time."""
+    import server
+
+    registry = StubRegistry([])
+    model = FakeModel(latency=latency, tool_rounds=tool_rounds)
+    latencies = []
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = make_agent(model, registry, 4, str(Path(tmp) / "memory.db"))
+        previous, server.ambassador = server.ambassador, agent
+        try:
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                slots = asyncio.Semaphore(concurrency)
+
+                async def ask(i: int):
+                    nonlocal errors
+                    async with slots:
+                        began = time.perf_counter()
+                        # Distinct questions so the answer cache doesn't hide the model
+                        resp = await client.post("/api/chat", json={"message": f"Question {i} about AIRC"})
+                        latencies.append(time.perf_counter() - began)
+                        errors += resp.status_code != 200
+
+                started = time.perf_counter()
+                await asyncio.gather(*(ask(i) for i in range(requests)))
+                elapsed = time.perf_counter() - started
+        finally:
+            server.ambassador = previous
+            await agent.http.aclose()
+            agent.memory.close()
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(requests / elapsed, 2),
+        "chat_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "chat_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+async def run(levels: list, messages: int = 64, senders: int = 16, requests: int = 32,
+              latency: float = 0.05, tool_rounds: list = None) -> dict:
+    """Both benchmarks at every concurrency level."""
+    return {
+        "model_latency_s": latency,
+        "tool_rounds": tool_rounds or [],
+        "inbox": [
+            await bench_inbox(level, messages, senders, latency, tool_rounds) for level in levels
+        ],
+        "chat": [
+            await bench_chat(level, requests, latency, tool_rounds) for level in levels
+        ],
+    }
+
+
+def report(results: dict):
+    rounds = " → ".join("+".join(r) for r in results["tool_rounds"]) or "none"
+    print(f"model latency {results['model_latency_s'] * 1000:.0f}ms per turn, tool rounds: {rounds}\n")
+
+    print(f"{'inbox':<8} {'conc':>5} {'msgs':>6} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results["inbox"]:
+        print(f"{'':<8} {r['concurrency']:>5} {r['replied']:>6} {r['throughput_per_s']:>8.1f} "
+              f"{r['reply_p50_ms']:>8.1f} {r['reply_p99_ms']:>8.1f}")
+
+    print(f"\n{'chat':<8} {'conc':>5} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in results["chat"]:
+        print(f"{'':<8} {r['concurrency']:>5} {r['requests']:>6} {r['throughput_per_s']:>8.1f} "
+              f"{r['chat_p50_ms']:>8.1f} {r['chat_p99_ms']:>8.1f} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated levels")
+    parser.add_argument("--messages", type=int, default=64, help="inbox messages per level")
+    parser.add_argument("--senders", type=int, default=16, help="distinct inbox senders")
+    parser.add_argument("--requests", type=int, default=32, help="/api/chat requests per level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model seconds per turn")
+    parser.add_argument("--tools", action="append", default=[],
+                        help="one tool-use round, e.g. search_knowledge,remember (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the agent's own log lines")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    tool_rounds = [round_.split(",") for round_ in args.tools]
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        results = asyncio.run(run(levels, args.messages, args.senders, args.requests, args.latency, tool_rounds))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        report(results)
+
+
+if __name__ == "__main__":
+    main()
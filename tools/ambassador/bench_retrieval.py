@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Retrieval benchmark: search_knowledge vs read_knowledge
+
+Compares the tool output each approach puts into the prompt for a set of
+typical questions. Offline it estimates tokens (~4 chars/token) and times
+the lookup. With --live it also answers every question through the real
+agent twice, once per tool, and reports input tokens and latency.
+
+Usage:
+  python bench_retrieval.py          # offline, no API key needed
+  python bench_retrieval.py --live   # needs ANTHROPIC_API_KEY
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from agent import AmbassadorAgent
+
+
+# (question, the read_knowledge topic a model would pick for it)
+QUESTIONS = [
+    ("What is AIRC?", "faq"),
+    ("Python example", "python"),
+    ("vs A2A", "vs_a2a"),
+    ("AIRC vs UCP", "vs_ucp"),
+    ("How does the consent flow work?", "spec"),
+    ("How do I send a message from TypeScript?", "typescript"),
+    ("Which tools does the MCP server expose?", "mcp"),
+    ("How does AIRC relate to Spirit Protocol?", "spirit"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def time_call(fn, *args, repeat: int = 200) -> float:
+    """Mean wall time of fn(*args) in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def offline(agent: AmbassadorAgent):
+    print(f"{'question':<44} {'read tok':>8} {'search tok':>10} {'read us':>8} {'search us':>9}")
+    read_total = search_total = 0
+    for question, topic in QUESTIONS:
+        read_tokens = estimate_tokens(agent._read_kb(topic))
+        search_tokens = estimate_tokens(agent._search_kb(question))
+        read_total += read_tokens
+        search_total += search_tokens
+        print(
+            f"{question[:44]:<44} {read_tokens:>8} {search_tokens:>10} "
+            f"{time_call(agent._read_kb, topic):>8.1f} {time_call(agent._search_kb, question):>9.1f}"
+        )
+    saved = 1 - search_total / read_total if read_total else 0
+    print(f"\nTool-result tokens: read_knowledge={read_total} search_knowledge={search_total} ({saved:.0%} fewer)")
+
+
+async def live(agent: AmbassadorAgent):
+    all_tools = agent.TOOLS
+    results = {}
+    for tool in ("read_knowledge", "search_knowledge"):
+        agent.TOOLS = [t for t in all_tools if t["name"] in (tool, "recall")]
+        latencies, tokens, writes = [], [], []
+        for question, _ in QUESTIONS:
+            start = time.perf_counter()
+            await agent._run_agent(f'Web visitor asks:\n\n"{question}"\n\nUse {tool} before answering. Keep it short.')
+            latencies.append(time.perf_counter() - start)
+            usage = agent.usage_log[-1]
+            # Every prompt token, whether uncached, read from or written to the cache
+            tokens.append(
+                usage["input_tokens"] + usage["cache_read_input_tokens"] + usage["cache_creation_input_tokens"]
+            )
+            writes.append(usage["cache_creation_input_tokens"])
+        results[tool] = (latencies, tokens, writes)
+
+    print(f"\n{'tool':<18} {'p50 s':>7} {'max s':>7} {'mean input tok':>15} {'cache write tok':>16}")
+    for tool, (latencies, tokens, writes) in results.items():
+        print(
+            f"{tool:<18} {statistics.median(latencies):>7.2f} {max(latencies):>7.2f} "
+            f"{statistics.mean(tokens):>15.0f} {statistics.mean(writes):>16.0f}"
+        )
+
+
+def main():
+    agent = AmbassadorAgent()
+    offline(agent)
+    if "--live" in sys.argv:
+        asyncio.run(live(agent))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Knowledge Base
+
+Loads every file under knowledge/ into memory once and serves reads from
+there. A background watcher re-reads only the files whose mtime changed.
+Shared by the agent (agent.py) and the MCP server (mcp_server.py).
+
+Markdown documents are also split into heading-level sections and indexed
+with BM25, so tools can return just the sections that match a question.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+KNOWLEDGE_PATH = Path(__file__).parent / "knowledge"
+
+# Topic names accepted by the agent's read_knowledge tool
+TOPICS = {
+    "spec": "spec/SPEC.md",
+    "python": "integration/PYTHON.md",
+    "typescript": "integration/TYPESCRIPT.md",
+    "mcp": "integration/MCP.md",
+    "vs_a2a": "comparison/VS_A2A.md",
+    "vs_ucp": "comparison/VS_UCP.md",
+    "faq": "faq/FAQ.md",
+    "spirit": "faq/SPIRIT.md"
+}
+
+
+# Longest section text returned by search; longer sections are cut here
+MAX_SECTION_CHARS = 2500
+
+
+class Section(NamedTuple):
+    """One heading-level chunk of a knowledge document."""
+    path: str
+    heading: str
+    text: str
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens. Common words are left to BM25's idf weighting."""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def split_sections(path: str, text: str) -> list[Section]:
+    """Split markdown at headings, ignoring '#' lines inside code fences.
+
+    Each section's heading is the chain of enclosing headings, e.g.
+    "AIRC FAQ > Is it secure?", so matches keep their context.
+    """
+    sections = []
+    trail: list[tuple[int, str]] = []
+    lines: list[str] = []
+    in_fence = False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            heading = " > ".join(title for _, title in trail) or path
+            sections.append(Section(path, heading, body))
+        lines.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else re.match(r"(#{1,6})\s+(.*)", line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            trail = [(lvl, title) for lvl, title in trail if lvl < level]
+            trail.append((level, match.group(2).strip()))
+        lines.append(line)
+    flush()
+    return sections
+
+
+class BM25Index:
+    """Okapi BM25 over knowledge sections."""
+
+    def __init__(self, sections: list[Section], k1: float = 1.5, b: float = 0.75):
+        self.sections = sections
+        self.k1 = k1
+        self.b = b
+        # Headings count twice: they summarize the section
+        self._tfs = [
+            Counter(tokenize(f"{s.heading} {s.heading} {s.path} {s.text}"))
+            for s in sections
+        ]
+        self._lengths = [sum(tf.values()) for tf in self._tfs]
+        self._avg_length = sum(self._lengths) / len(sections) if sections else 0
+        df = Counter(term for tf in self._tfs for term in tf)
+        n = len(sections)
+        self._idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5))
+            for term, freq in df.items()
+        }
+
+    def search(self, query: str, k: int = 3) -> list[tuple[float, Section]]:
+        """Top-k (score, section) pairs with a positive score."""
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        scored = []
+        for i, tf in enumerate(self._tfs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / self._avg_length)
+            score = sum(
+                self._idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm)
+                for t in terms if t in tf
+            )
+            if score > 0:
+                scored.append((score, self.sections[i]))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:k]
+
+
+class KnowledgeBase:
+    """In-memory copy of the knowledge/ tree, keyed by relative path."""
+
+    def __init__(self, path: Path = KNOWLEDGE_PATH):
+        self.path = path
+        self._docs: dict[str, str] = {}
+        self._mtimes: dict[str, int] = {}
+        # Bumped on every change so dependents (answer cache) can invalidate
+        self.generation = 0
+        # Same contents, same fingerprint: comparable across processes
+        self.fingerprint = ""
+        self._watcher: Optional[asyncio.Task] = None
+        self._index: Optional[BM25Index] = None
+        self._index_generation = -1
+        self.reload()
+
+    def read(self, rel_path: str) -> Optional[str]:
+        """Return a document by path relative to knowledge/, or None."""
+        return self._docs.get(rel_path)
+
+    def read_topic(self, topic: str) -> Optional[str]:
+        """Return the document for a read_knowledge topic (default: spec)."""
+        return self.read(TOPICS.get(topic, TOPICS["spec"]))
+
+    def documents(self) -> dict[str, str]:
+        """All loaded documents, keyed by relative path."""
+        return self._docs
+
+    def search(self, query: str, k: int = 3) -> list[Section]:
+        """The k sections that best match `query`, best first."""
+        return [section for _, section in self.index().search(query, k)]
+
+    def index(self) -> BM25Index:
+        """Section index for the current generation, rebuilt after reloads."""
+        if self._index_generation != self.generation:
+            sections = [
+                section
+                for rel, text in sorted(self._docs.items()) if rel.endswith(".md")
+                for section in split_sections(rel, text)
+            ]
+            self._index = BM25Index(sections)
+            self._index_generation = self.generation
+        return self._index
+
+    def reload(self) -> bool:
+        """Re-read files whose mtime changed. Returns True if anything did."""
+        mtimes = {}
+        try:
+            for p in self.path.rglob("*"):
+                if p.is_file():
+                    mtimes[p.relative_to(self.path).as_posix()] = p.stat().st_mtime_ns
+        except OSError as e:
+            print(f"Knowledge scan failed: {e}", flush=True)
+            return False
+
+        if mtimes == self._mtimes:
+            return False
+
+        docs = {}
+        for rel, mtime in mtimes.items():
+            if self._mtimes.get(rel) == mtime:
+                # Unchanged; a file that failed to read stays skipped
+                # until its mtime changes
+                if rel in self._docs:
+                    docs[rel] = self._docs[rel]
+                continue
+            try:
+                docs[rel] = (self.path / rel).read_text()
+            except (OSError, UnicodeDecodeError):
+                pass
+        self._mtimes = mtimes
+        if docs == self._docs:
+            return False
+
+        # Swap in one step so readers never see a half-loaded tree
+        self._docs = docs
+        self.generation += 1
+        digest = hashlib.sha1()
+        for rel, text in sorted(docs.items()):
+            digest.update(f"{rel}\0{text}\0".encode())
+        self.fingerprint = digest.hexdigest()[:12]
+        return True
+
+    def start_watching(self, interval: float = 5.0):
+        """Poll for changed files in the background (idempotent)."""
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                changed = await asyncio.to_thread(self.reload)
+            except Exception as e:
+                print(f"Knowledge reload failed: {e}", flush=True)  # Keep watching
+                continue
+            if changed:
+                print(f"📚 Knowledge base reloaded ({len(self._docs)} files)", flush=True)
+
+
+_shared: dict[Path, KnowledgeBase] = {}
+
+
+def get_knowledge_base(path: Path = KNOWLEDGE_PATH) -> KnowledgeBase:
+    """The process-wide knowledge base for `path`, loaded on first use."""
+    if path not in _shared:
+        _shared[path] = KnowledgeBase(path)
+    return _shared[path]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Leader Election
+
+With several server workers, HTTP and WebSocket traffic is spread across
+all of them, but exactly one may run the agent loop (inbox polling and
+presence heartbeats); two would double every reply. The loop is guarded
+by a lease row in SQLite (the memory database by default):
+- every worker campaigns; the one holding an unexpired lease runs the loop
+- the holder renews every ttl/3 and stops the loop if renewal fails
+- on clean shutdown the lease is released, so another worker takes over
+  within ttl/3; if the holder dies, within ttl
+
+A lease is not a fencing token: a leader stalled for longer than ttl can
+briefly overlap its successor, until its next renewal fails.
+"""
+
+import asyncio
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+
+class Lease:
+    """A named, expiring lease in a SQLite table, shared across processes."""
+
+    def __init__(self, path: Path, name: str = "agent-loop", ttl: float = 15.0,
+                 owner: Optional[str] = None):
+        self.path = Path(path)
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        self.held = False
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def try_acquire(self) -> bool:
+        """Take the lease if it is free, expired or already ours (renewing it)."""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                self.held = False  # Database busy past the timeout: assume lost
+                return False
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)
+                ).fetchone()
+                if row is None or row[0] == self.owner or row[1] < now:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                        (self.name, self.owner, now + self.ttl)
+                    )
+                    self.held = True
+                else:
+                    self.held = False
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.held
+
+    def release(self):
+        """Give the lease up now instead of letting it expire."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner)
+            )
+            self.held = False
+
+    def holder(self) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return {"owner": row[0], "expires_in_s": round(row[1] - time.time(), 1)}
+
+    def stats(self) -> dict:
+        return {"role": "leader" if self.held else "follower", "owner": self.owner, "holder": self.holder()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+async def lead(lease: Lease, work: Callable[[], Awaitable[None]]):
+    """Campaign for `lease` forever, running `work()` whenever we hold it.
+
+    Cancel to stop; the lease is released on the way out.
+    """
+    interval = lease.ttl / 3
+    try:
+        while True:
+            if await asyncio.to_thread(lease.try_acquire):
+                print(f"👑 Holding {lease.name} lease; running agent loop", flush=True)
+                task = asyncio.create_task(work())
+                try:
+                    while True:
+                        done, _ = await asyncio.wait({task}, timeout=interval)
+                        if done:
+                            # The loop ended on its own: let another worker try
+                            await asyncio.to_thread(lease.release)
+                            break
+                        if not await asyncio.to_thread(lease.try_acquire):
+                            print(f"⚠️  Lost {lease.name} lease; stopping agent loop", flush=True)
+                            break
+                finally:
+                    if not task.done():
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(interval)
+    finally:
+        if lease.held:
+            await asyncio.to_thread(lease.release)
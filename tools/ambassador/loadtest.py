@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Load test: /ws/chat sessions plus /api/chat and /api/feed traffic
+
+Opens many WebSocket chat sessions and fires REST requests at fixed
+average rates (Poisson arrivals, so bursts happen) against a server.
+Without --url it first starts a local instance in a subprocess, with
+bench_agent's stub registry and fake model in place of the real ones.
+
+Reports WebSocket connection setup time, p50/p95/p99 latency and error
+rate per endpoint, server event-loop lag (from /health) and the load
+generator's own loop lag, which should stay low for the numbers to mean
+anything. --out saves the summary as JSON and --compare prints the change
+against an earlier one, so releases can be compared.
+
+Usage:
+  python loadtest.py                                  # local stub instance
+  python loadtest.py --ws-sessions 100 --chat-rate 10 --feed-rate 50 --duration 60
+  python loadtest.py --url http://localhost:8080      # an instance you started
+  python loadtest.py --out v2.json --compare v1.json
+  python loadtest.py serve --port 8090                # only run the stub instance
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+import websockets
+
+from bench_agent import FakeModel, StubRegistry, make_agent, percentile
+
+
+# ─────────────────────────────────────────────────────────────────
+# Stub instance
+# ─────────────────────────────────────────────────────────────────
+
+def serve_stub(port: int, latency: float, tool_rounds: list):
+    """Run server.app with a fake model and registry (blocks)."""
+    import uvicorn
+
+    import server
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        with tempfile.TemporaryDirectory() as tmp:
+            server.ambassador = make_agent(
+                FakeModel(latency=latency, tool_rounds=tool_rounds, seed=port),
+                StubRegistry([]), 4, str(Path(tmp) / "memory.db"),
+            )
+            lag_task = asyncio.create_task(server.monitor_loop_lag())
+            yield
+            lag_task.cancel()
+            server.ambassador.memory.close()
+
+    server.app.router.lifespan_context = lifespan
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_stub(latency: float, tool_rounds: list) -> tuple[subprocess.Popen, str]:
+    """Start a stub instance in a subprocess and wait until it answers."""
+    port = free_port()
+    cmd = [sys.executable, __file__, "serve", "--port", str(port), "--latency", str(latency)]
+    for round_ in tool_rounds:
+        cmd += ["--tools", ",".join(round_)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+
+    async with httpx.AsyncClient() as client:
+        for _ in range(150):
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return proc, url
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None:
+                break
+            await asyncio.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("stub instance did not start")
+
+
+# ─────────────────────────────────────────────────────────────────
+# Load generation
+# ─────────────────────────────────────────────────────────────────
+
+class Recorder:
+    """Latencies and outcomes per operation name."""
+
+    def __init__(self):
+        self.latencies: dict[str, list] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.error_kinds: dict[str, int] = defaultdict(int)
+
+    def ok(self, name: str, seconds: float):
+        self.latencies[name].append(seconds)
+
+    def error(self, name: str, kind: str):
+        self.errors[name] += 1
+        self.error_kinds[f"{name}: {kind}"] += 1
+
+    def summary(self) -> dict:
+        result = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies[name]
+            total = len(values) + self.errors[name]
+            result[name] = {
+                "count": total,
+                "errors": self.errors[name],
+                "error_rate": round(self.errors[name] / total, 4) if total else 0.0,
+                "p50_ms": round(percentile(values, 0.5) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+                "max_ms": round(max(values, default=0) * 1000, 1),
+            }
+        return result
+
+
+async def ws_session(url: str, n: int, interval: float, stream: bool, stop_at: float, rec: Recorder):
+    """One visitor: connect, then ask a question every `interval` seconds."""
+    ws_url = url.replace("http", "ws", 1) + "/ws/chat"
+    # Spread connections and questions so sessions don't move in lockstep
+    await asyncio.sleep(random.uniform(0, min(interval, 1.0)))
+
+    started = time.perf_counter()
+    connected = False
+    try:
+        async with websockets.connect(ws_url, open_timeout=10) as ws:
+            await ws.recv()  # welcome
+            rec.ok("ws_connect", time.perf_counter() - started)
+            connected = True
+
+            asked = 0
+            while time.perf_counter() < stop_at:
+                asked += 1
+                began = time.perf_counter()
+                await ws.send(json.dumps({"message": f"Visitor {n} question {asked}", "stream": stream}))
+                while True:
+                    frame = json.loads(await ws.recv())
+                    if not stream or frame.get("type") in ("done", "error", "busy"):
+                        break
+                if frame.get("type") in ("error", "busy"):
+                    rec.error("ws_chat", frame["type"])
+                else:
+                    rec.ok("ws_chat", time.perf_counter() - began)
+                await asyncio.sleep(random.expovariate(1 / interval))
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+        rec.error("ws_chat" if connected else "ws_connect", type(e).__name__)
+
+
+async def open_loop(client: httpx.AsyncClient, name: str, rate: float, stop_at: float,
+                    request, rec: Recorder):
+    """Fire `request(client, i)` at `rate`/s on average, without waiting for replies."""
+    if rate <= 0:
+        return
+    tasks = []
+
+    async def one(i: int):
+        began = time.perf_counter()
+        try:
+            resp = await request(client, i)
+        except httpx.HTTPError as e:
+            rec.error(name, type(e).__name__)
+            return
+        if resp.status_code >= 400:
+            rec.error(name, str(resp.status_code))
+        else:
+            rec.ok(name, time.perf_counter() - began)
+
+    i = 0
+    while time.perf_counter() < stop_at:
+        tasks.append(asyncio.create_task(one(i)))
+        i += 1
+        await asyncio.sleep(random.expovariate(rate))
+    await asyncio.gather(*tasks)
+
+
+async def client_loop_lag(stop_at: float, rec: Recorder, interval: float = 0.05):
+    loop = asyncio.get_running_loop()
+    while time.perf_counter() < stop_at:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        rec.ok("client_loop_lag", max(0.0, loop.time() - expected))
+
+
+async def run(url: str, duration: float, ws_sessions: int, ws_interval: float, stream: bool,
+              chat_rate: float, feed_rate: float) -> dict:
+    rec = Recorder()
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        await asyncio.gather(
+            client_loop_lag(stop_at, rec),
+            *(ws_session(url, n, ws_interval, stream, stop_at, rec) for n in range(ws_sessions)),
+            open_loop(client, "api_chat", chat_rate, stop_at,
+                      lambda c, i: c.post("/api/chat", json={"message": f"REST question {i}"}), rec),
+            open_loop(client, "api_feed", feed_rate, stop_at,
+                      lambda c, i: c.get("/api/feed"), rec),
+        )
+        try:
+            health = (await client.get("/health")).json()
+        except (httpx.HTTPError, ValueError):
+            health = {}
+
+    stats = rec.summary()
+    client_lag = stats.pop("client_loop_lag", {})
+    return {
+        "config": {
+            "url": url, "duration_s": duration, "ws_sessions": ws_sessions,
+            "ws_interval_s": ws_interval, "stream": stream,
+            "chat_rate": chat_rate, "feed_rate": feed_rate,
+        },
+        "endpoints": stats,
+        "server_loop_lag": health.get("event_loop", {}),
+        "client_loop_lag": {k: client_lag.get(k) for k in ("p50_ms", "p99_ms", "max_ms")},
+        "errors": dict(rec.error_kinds),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────
+# Reporting
+# ─────────────────────────────────────────────────────────────────
+
+def report(summary: dict):
+    print(f"{'operation':<12} {'count':>7} {'err %':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, s in summary["endpoints"].items():
+        print(f"{name:<12} {s['count']:>7} {s['error_rate'] * 100:>6.2f} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}")
+
+    server_lag = summary["server_loop_lag"]
+    if server_lag:
+        print(f"\nserver loop lag: p50 {server_lag['p50_ms']}ms, p99 {server_lag['p99_ms']}ms "
+              f"(since the server started)")
+    client_lag = summary["client_loop_lag"]
+    print(f"client loop lag: p99 {client_lag['p99_ms']}ms, max {client_lag['max_ms']}ms")
+    if (client_lag["p99_ms"] or 0) > 50:
+        print("  ⚠️  load generator is saturated; latencies above are inflated")
+    for kind, count in summary["errors"].items():
+        print(f"  error {kind} ×{count}")
+
+
+def compare(summary: dict, baseline: dict):
+    """Print latency and error-rate changes against an earlier summary."""
+    print(f"\n{'vs baseline':<12} {'p50':>9} {'p95':>9} {'p99':>9} {'err %':>9}")
+    for name, s in summary["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if not old:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{(s[key] - old[key]) / old[key] * 100:+8.1f}%" if old[key] else f"{'n/a':>9}")
+        cells.append(f"{(s['error_rate'] - old['error_rate']) * 100:+9.2f}")
+        print(f"{name:<12} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("mode", nargs="?", choices=["run", "serve"], default="run")
+    parser.add_argument("--url", help="target server (default: start a local stub instance)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--ws-sessions", type=int, default=50, help="concurrent /ws/chat sessions")
+    parser.add_argument("--ws-interval", type=float, default=5, help="mean seconds between questions per session")
+    parser.add_argument("--no-stream", action="store_true", help="ask over /ws/chat without delta frames")
+    parser.add_argument("--chat-rate", type=float, default=2, help="/api/chat requests per second")
+    parser.add_argument("--feed-rate", type=float, default=10, help="/api/feed requests per second")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub model seconds per turn")
+    parser.add_argument("--tools", action="append", default=[], help="stub tool-use round (repeatable)")
+    parser.add_argument("--port", type=int, default=8090, help="port for `serve`")
+    parser.add_argument("--out", help="write the summary JSON here")
+    parser.add_argument("--compare", help="baseline summary JSON to compare against")
+    args = parser.parse_args()
+
+    tool_rounds = [round_.split(",") for round_ in args.tools]
+    if args.mode == "serve":
+        serve_stub(args.port, args.latency, tool_rounds)
+        return
+
+    async def go():
+        proc = None
+        url = args.url
+        if not url:
+            proc, url = await start_stub(args.latency, tool_rounds)
+            print(f"stub instance at {url} (model {args.latency * 1000:.0f}ms per turn)")
+        try:
+            return await run(url.rstrip("/"), args.duration, args.ws_sessions, args.ws_interval,
+                             not args.no_stream, args.chat_rate, args.feed_rate)
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait()
+
+    summary = asyncio.run(go())
+    report(summary)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(summary, indent=2))
+    if args.compare:
+        compare(summary, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,8 +18,11 @@ Install:
 
 import asyncio
 import json
+import os
 import sys
-from pathlib import Path
+
+from knowledge import get_knowledge_base
+from scheduler import Busy, ModelScheduler
 
 # MCP protocol implementation (simplified)
 # In production, use @modelcontextprotocol/sdk
@@ -29,7 +32,17 @@ class AmbassadorMCP:
     """MCP server that proxies to the ambassador."""
 
     def __init__(self):
-        self.kb_path = Path(__file__).parent / "knowledge"
+        self.knowledge = get_knowledge_base()
+        # Same gate as the agent, at MCP priority (this is its own process)
+        self.scheduler = ModelScheduler(
+            max_concurrent=int(os.environ.get("AMBASSADOR_MODEL_CONCURRENCY", 8))
+        )
+        self.usage = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
 
     def get_tools(self):
         """Return available tools."""
@@ -121,16 +134,20 @@ class AmbassadorMCP:
         try:
             import anthropic
 
-            client = anthropic.Anthropic()
+            client = anthropic.AsyncAnthropic()
 
             # Build context from knowledge base
             spec = self._read_kb("spec/SPEC.md")
             faq = self._read_kb("faq/FAQ.md")
 
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1500,
-                system=f"""You are the AIRC Ambassador. Answer questions about AIRC concisely.
+            async with self.scheduler.slot("mcp"):
+                response = await client.messages.create(
+                    model="claude-sonnet-4-20250514",
+                    max_tokens=1500,
+                    # Spec and FAQ are identical on every call: cache the prefix
+                    system=[{
+                        "type": "text",
+                        "text": f"""You are the AIRC Ambassador. Answer questions about AIRC concisely.
 
 AIRC Spec Summary:
 {spec[:3000]}
@@ -143,20 +160,36 @@ Guidelines:
 - Give code examples when relevant
 - Be honest about limitations
 - Position AIRC as complementary to MCP/A2A/UCP, not competing""",
-                messages=[{"role": "user", "content": question}]
-            )
+                        "cache_control": {"type": "ephemeral"}
+                    }],
+                    messages=[{"role": "user", "content": question}]
+                )
 
+            self._log_usage(response.usage)
             return response.content[0].text
 
+        except Busy as e:
+            return f"The ambassador is busy right now. Try again in {e.retry_after}s."
         except Exception as e:
             return f"Error: {e}. Make sure ANTHROPIC_API_KEY is set."
 
+    def _log_usage(self, usage):
+        """Record token usage, including prompt-cache reads and writes."""
+        for key in self.usage:
+            self.usage[key] += getattr(usage, key, None) or 0
+        # stdout carries the MCP protocol, so report on stderr
+        sys.stderr.write(
+            f"airc_ask: in={usage.input_tokens} out={usage.output_tokens} "
+            f"cache_read={usage.cache_read_input_tokens or 0} "
+            f"cache_write={usage.cache_creation_input_tokens or 0}\n"
+        )
+
     def _read_kb(self, path: str) -> str:
         """Read from knowledge base."""
-        try:
-            return (self.kb_path / path).read_text()
-        except:
+        text = self.knowledge.read(path)
+        if text is None:
             return f"Knowledge not found: {path}"
+        return text
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -166,6 +199,7 @@ Guidelines:
 async def main():
     """Run MCP server over stdio."""
     server = AmbassadorMCP()
+    server.knowledge.start_watching()
 
     # Read from stdin, write to stdout
     reader = asyncio.StreamReader()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Memory Store
+
+Per-handle memory in SQLite (WAL mode). Each `remember` touches only one
+row instead of rewriting a whole JSON file, and all database work runs in
+a worker thread so it never blocks the event loop.
+
+Notes are compacted as they grow: the last `keep_notes` raw notes are kept
+verbatim and older ones fold into a summary, so the rendered `notes` that
+go into prompts stay under `max_note_chars`.
+
+The legacy memory.json is imported once, the first time a store opens.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+DB_PATH = Path(__file__).parent / "memory.db"
+LEGACY_JSON = Path(__file__).parent / "memory.json"
+
+SUMMARY_PREFIX = "Summary: "
+
+# Bookkeeping fields that stay out of recall results
+INTERNAL_FIELDS = ("recent_notes", "summary", "summary_pending", "notes_chars")
+
+
+def compact_notes(record: dict, keep_notes: int, max_chars: int) -> dict:
+    """Fold old notes into the summary and re-render `notes` within budget.
+
+    Legacy records with only a flat `notes` string are split into one raw
+    note per line first. Whenever notes are folded, `summary_pending` is set
+    so the agent can rewrite the summary with the model.
+    """
+    notes = record.get("recent_notes")
+    if notes is None:
+        notes = [line for line in record.get("notes", "").splitlines() if line.strip()]
+    notes = list(notes)
+    summary = record.get("summary", "")
+
+    overflow = notes[:-keep_notes] if len(notes) > keep_notes else []
+    notes = notes[len(overflow):]
+    # Raw notes may use at most two thirds of the budget; the rest is summary
+    while len(notes) > 1 and sum(len(n) + 1 for n in notes) > max_chars * 2 // 3:
+        overflow.append(notes.pop(0))
+
+    if overflow:
+        summary = "\n".join([summary, *overflow]).strip()
+        record["summary_pending"] = True
+
+    recent = "\n".join(notes)[-max_chars:]
+    room = max(0, max_chars - len(recent) - len(SUMMARY_PREFIX) - 1)
+    if len(summary) > room:
+        # Until the model rewrites it, keep the newest part of the summary
+        summary = ("…" + summary[-(room - 1):]) if room > 1 else ""
+
+    rendered = f"{SUMMARY_PREFIX}{summary}\n{recent}" if summary else recent
+    record.update(
+        recent_notes=notes,
+        summary=summary,
+        notes=rendered.strip(),
+        notes_chars=len(rendered.strip()),
+    )
+    return record
+
+
+def public_record(record: dict) -> dict:
+    """A record without compaction bookkeeping, for recall."""
+    return {k: v for k, v in record.items() if k not in INTERNAL_FIELDS}
+
+
+class MemoryStore:
+    """What the ambassador remembers about each handle."""
+
+    def __init__(
+        self,
+        path: Path = DB_PATH,
+        legacy_json: Optional[Path] = LEGACY_JSON,
+        keep_notes: int = 8,
+        max_note_chars: int = 2000,
+    ):
+        self.path = Path(path)
+        self.keep_notes = keep_notes
+        self.max_note_chars = max_note_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory ("
+            " handle TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL,"
+            " notes_chars INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._migrate()
+
+        if legacy_json and not self._get_meta("imported_memory_json"):
+            self.import_json(legacy_json)
+
+    def _migrate(self):
+        """Bring a database from an older release up to the current schema.
+
+        Several server workers may open the same file at once, so the
+        check and the change happen in one write transaction.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(memory)")}
+            if "notes_chars" not in columns:
+                self._conn.execute("ALTER TABLE memory ADD COLUMN notes_chars INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    # ─────────────────────────────────────────────────────────────────
+    # Async API (used by the agent)
+    # ─────────────────────────────────────────────────────────────────
+
+    async def get(self, handle: str) -> Optional[dict]:
+        """Everything remembered about a handle, or None."""
+        return await asyncio.to_thread(self._get, handle)
+
+    async def contains(self, handle: str) -> bool:
+        """Whether we have ever recorded anything about a handle."""
+        return await self.get(handle) is not None
+
+    async def put(self, handle: str, record: dict):
+        """Replace the record for a handle."""
+        await asyncio.to_thread(self._put, handle, record)
+
+    async def remember(self, handle: str, note: str) -> dict:
+        """Append a dated note to a handle's record and return the record."""
+        return await asyncio.to_thread(self._remember, handle, note)
+
+    async def set_summary(self, handle: str, summary: str, replaces: str):
+        """Swap the summary text `replaces` for a rewritten `summary`.
+
+        Notes folded in after `replaces` was read are kept after the new
+        summary; if the summary was trimmed meanwhile, nothing changes.
+        """
+        await asyncio.to_thread(self._set_summary, handle, summary, replaces)
+
+    async def get_meta(self, key: str) -> Optional[str]:
+        """A small piece of agent state, e.g. the inbox cursor."""
+        return await asyncio.to_thread(self._locked_get_meta, key)
+
+    async def set_meta(self, key: str, value: str):
+        """Persist a small piece of agent state."""
+        await asyncio.to_thread(self._set_meta, key, value)
+
+    async def note_stats(self) -> dict:
+        """Rendered note sizes across handles, largest first."""
+        return await asyncio.to_thread(self._note_stats)
+
+    # ─────────────────────────────────────────────────────────────────
+    # Blocking implementation (runs in a worker thread)
+    # ─────────────────────────────────────────────────────────────────
+
+    def _get(self, handle: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM memory WHERE handle = ?", (handle,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, handle: str, record: dict):
+        with self._lock:
+            self._write(handle, record)
+
+    def _remember(self, handle: str, note: str):
+        # Read-modify-write under one lock and transaction: no lost notes
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM memory WHERE handle = ?", (handle,)
+                ).fetchone()
+                record = json.loads(row[0]) if row else {}
+                compact_notes(record, self.keep_notes, self.max_note_chars)
+                timestamp = datetime.now().strftime("%Y-%m-%d")
+                record["recent_notes"].append(f"[{timestamp}] {note}")
+                compact_notes(record, self.keep_notes, self.max_note_chars)
+                record["last_interaction"] = datetime.now().isoformat()
+                self._write(handle, record)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return record
+
+    def _set_summary(self, handle: str, summary: str, replaces: str):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM memory WHERE handle = ?", (handle,)
+                ).fetchone()
+                record = json.loads(row[0]) if row else {}
+                current = record.get("summary", "")
+                if row and current.startswith(replaces):
+                    newer = current[len(replaces):].strip()
+                    record["summary"] = f"{summary.strip()}\n{newer}".strip()
+                    if not newer:
+                        record.pop("summary_pending", None)
+                    compact_notes(record, self.keep_notes, self.max_note_chars)
+                    self._write(handle, record)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _note_stats(self) -> dict:
+        with self._lock:
+            count, total, largest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(notes_chars), 0), COALESCE(MAX(notes_chars), 0) FROM memory"
+            ).fetchone()
+            top = self._conn.execute(
+                "SELECT handle, notes_chars FROM memory ORDER BY notes_chars DESC LIMIT 5"
+            ).fetchall()
+        return {
+            "handles": count,
+            "total_chars": total,
+            "max_chars": largest,
+            "mean_chars": round(total / count) if count else 0,
+            "budget_chars": self.max_note_chars,
+            "largest": dict(top),
+        }
+
+    def _write(self, handle: str, record: dict):
+        self._conn.execute(
+            "INSERT INTO memory (handle, data, updated_at, notes_chars) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(handle) DO UPDATE SET data = excluded.data,"
+            " updated_at = excluded.updated_at, notes_chars = excluded.notes_chars",
+            (handle, json.dumps(record), datetime.now().isoformat(), len(record.get("notes", "")))
+        )
+
+    def _locked_get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get_meta(key)
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def import_json(self, path: Path) -> int:
+        """Import a memory.json file, keeping rows that already exist.
+
+        Returns the number of handles imported.
+        """
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            data = {}
+
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                imported = 0
+                for handle, record in data.items():
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO memory (handle, data, updated_at, notes_chars)"
+                        " VALUES (?, ?, ?, ?)",
+                        (handle, json.dumps(record), now, len(record.get("notes", "")))
+                    )
+                    imported += cur.rowcount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_memory_json', ?)",
+                    (now,)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if imported:
+            print(f"✓ Imported {imported} handles from {path}", flush=True)
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
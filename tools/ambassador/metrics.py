@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Metrics
+
+Small in-process metric types with Prometheus-style cumulative buckets.
+Cheap enough to update on every request; rendering to the Prometheus text
+format only happens when /metrics is scraped.
+"""
+
+import bisect
+from typing import Callable, Iterable, Optional
+
+
+# Seconds; covers fast registry calls through slow model turns
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Token counts per model call
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Bucketed distribution of observations, one series per label value."""
+
+    def __init__(self, name: str, help: str, label: str = "", buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        # label value -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[str, list] = {}
+
+    def observe(self, value: float, label: str = ""):
+        series = self._series.get(label)
+        if series is None:
+            series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, q: float, label: str = "") -> float:
+        """Estimate a quantile by interpolating within its bucket."""
+        series = self._series.get(label)
+        if not series or not series[2]:
+            return 0.0
+        counts, _, total = series
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self) -> dict:
+        """Count, mean and p50/p95/p99 per label value, in milliseconds."""
+        result = {}
+        for label, (_, total, count) in sorted(self._series.items()):
+            result[label] = {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 1) if count else 0.0,
+                "p50_ms": round(self.quantile(0.5, label) * 1000, 1),
+                "p95_ms": round(self.quantile(0.95, label) * 1000, 1),
+                "p99_ms": round(self.quantile(0.99, label) * 1000, 1),
+            }
+        return result
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.help, "histogram")
+        for label, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label, label, le=le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label, label)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label, label)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic total, one series per label value."""
+
+    def __init__(self, name: str, help: str, label: str = ""):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values: dict[str, float] = {}
+
+    def inc(self, amount: float = 1, label: str = ""):
+        self._values[label] = self._values.get(label, 0) + amount
+
+    def value(self, label: str = "") -> float:
+        return self._values.get(label, 0)
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.help, "counter")
+        for label, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label, label)} {_number(value)}")
+        return lines
+
+
+class Gauge:
+    """Current value, either set directly or read from `fn` at scrape time.
+
+    `fn` returns a number, or a dict of label value -> number.
+    """
+
+    def __init__(self, name: str, help: str, label: str = "", fn: Optional[Callable] = None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.fn = fn
+        self._values: dict[str, float] = {}
+
+    def set(self, value: float, label: str = ""):
+        self._values[label] = value
+
+    def inc(self, amount: float = 1, label: str = ""):
+        self._values[label] = self._values.get(label, 0) + amount
+
+    def dec(self, amount: float = 1, label: str = ""):
+        self.inc(-amount, label)
+
+    def value(self, label: str = "") -> float:
+        return self._read().get(label, 0)
+
+    def _read(self) -> dict:
+        if self.fn is None:
+            return self._values
+        value = self.fn()
+        return value if isinstance(value, dict) else {"": value}
+
+    def render(self) -> list[str]:
+        lines = _header(self.name, self.help, "gauge")
+        for label, value in sorted(self._read().items()):
+            lines.append(f"{self.name}{_labels(self.label, label)} {_number(value)}")
+        return lines
+
+
+def exposition(metrics: Iterable) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _header(name: str, help: str, kind: str) -> list[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+
+def _labels(name: str, value: str, **extra: str) -> str:
+    pairs = [(name, value)] if name else []
+    pairs += extra.items()
+    if not pairs:
+        return ""
+    escaped = (f'{k}="{_escape(str(v))}"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
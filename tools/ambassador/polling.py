@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Poll Scheduler
+
+Decides how long the agent waits before polling its inbox again:
+- right after traffic, poll fast (more messages usually follow)
+- while the inbox stays empty, back off exponentially up to a ceiling
+- after errors, back off on a separate, slower schedule
+
+All waits get random jitter so many agents don't poll in lockstep.
+"""
+
+import random
+from typing import Optional
+
+
+class AdaptivePoll:
+    """Next-poll delay from the outcome of the previous poll."""
+
+    def __init__(
+        self,
+        fast: float = 1.0,
+        idle_max: float = 30.0,
+        factor: float = 2.0,
+        jitter: float = 0.2,
+        error_base: float = 5.0,
+        error_max: float = 300.0,
+    ):
+        self.fast = fast
+        self.idle_max = idle_max
+        self.factor = factor
+        self.jitter = jitter
+        self.error_base = error_base
+        self.error_max = error_max
+
+        self.idle_polls = 0
+        self.errors = 0
+        self.last_delay = 0.0
+
+    def next_delay(self, found: Optional[int]) -> float:
+        """Seconds to wait after a poll that found `found` messages.
+
+        `found` is None when the poll failed.
+        """
+        # Streaks stop counting once the delay reaches its ceiling: further
+        # steps change nothing, and factor ** n would overflow in the end
+        if found is None:
+            if not self.errors or self.error_base * self.factor ** (self.errors - 1) < self.error_max:
+                self.errors += 1
+            delay = min(self.error_max, self.error_base * self.factor ** (self.errors - 1))
+        else:
+            self.errors = 0
+            if found:
+                self.idle_polls = 0
+                delay = self.fast
+            else:
+                if self.fast * self.factor ** self.idle_polls < self.idle_max:
+                    self.idle_polls += 1
+                delay = min(self.idle_max, self.fast * self.factor ** self.idle_polls)
+
+        self.last_delay = delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return self.last_delay
+
+    def stats(self) -> dict:
+        return {
+            "idle_polls": self.idle_polls,
+            "errors": self.errors,
+            "next_delay_s": round(self.last_delay, 2),
+        }
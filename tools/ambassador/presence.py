@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Presence Cache
+
+Short-TTL cache of GET /api/presence shared by the who_online tool and
+the new-agent welcomer:
+- concurrent callers share one in-flight fetch (single flight)
+- refreshes are conditional (ETag / Last-Modified) when the registry
+  sends validators, so an unchanged list costs a 304
+- entries are indexed by handle for O(1) lookups
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+
+class PresenceSnapshot:
+    """One parsed presence response."""
+
+    def __init__(self, data=None):
+        # The registry returns either a bare list or {active, systemAccounts}
+        if isinstance(data, dict):
+            self.active = data.get("active", [])
+            self.system = data.get("systemAccounts", [])
+        else:
+            self.active = data or []
+            self.system = []
+        self.by_handle = {
+            handle: entry
+            for entry in self.active + self.system
+            if (handle := entry.get("username") or entry.get("handle"))
+        }
+
+    @property
+    def everyone(self) -> list:
+        return self.active + self.system
+
+
+class PresenceCache:
+    """Presence list cached for `ttl` seconds."""
+
+    def __init__(
+        self,
+        fetch: Callable[[dict], Awaitable[httpx.Response]],
+        ttl: float = 10.0,
+    ):
+        # fetch(headers) performs GET /api/presence with the given headers
+        self._fetch_presence = fetch
+        self.ttl = ttl
+        self._snapshot = PresenceSnapshot()
+        self._fetched_at: Optional[float] = None
+        self._validators: dict = {}
+        self._inflight: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.fetches = 0
+        self.not_modified = 0
+        self.shared = 0
+        self.failures = 0
+
+    async def get(self) -> PresenceSnapshot:
+        """Current presence, fetched at most once per TTL."""
+        if self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl:
+            self.hits += 1
+            return self._snapshot
+
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._refresh())
+            self._inflight.add_done_callback(self._clear_inflight)
+        else:
+            self.shared += 1
+        # Shielded: one caller being cancelled must not cancel the others' fetch
+        return await asyncio.shield(self._inflight)
+
+    async def lookup(self, handle: str) -> Optional[dict]:
+        """Presence entry for a handle, or None if they are not online."""
+        return (await self.get()).by_handle.get(handle)
+
+    def invalidate(self):
+        self._fetched_at = None
+
+    def _clear_inflight(self, _):
+        self._inflight = None
+
+    async def _refresh(self) -> PresenceSnapshot:
+        self.fetches += 1
+        headers = {}
+        if "etag" in self._validators:
+            headers["If-None-Match"] = self._validators["etag"]
+        if "last-modified" in self._validators:
+            headers["If-Modified-Since"] = self._validators["last-modified"]
+
+        try:
+            resp = await self._fetch_presence(headers)
+        except Exception as e:
+            # Serve the last good list rather than nothing
+            self.failures += 1
+            print(f"Presence fetch failed: {e}", flush=True)
+            return self._snapshot
+
+        if resp.status_code == 304:
+            self.not_modified += 1
+        elif resp.status_code == 200:
+            self._snapshot = PresenceSnapshot(resp.json())
+            self._validators = {
+                k: resp.headers[k] for k in ("etag", "last-modified") if k in resp.headers
+            }
+        else:
+            self.failures += 1
+            return self._snapshot
+
+        self._fetched_at = time.monotonic()
+        return self._snapshot
+
+    def stats(self) -> dict:
+        return {
+            "online": len(self._snapshot.by_handle),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+            "shared_fetches": self.shared,
+            "failures": self.failures,
+        }
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Rate Limiter
+
+Token buckets keyed by handle, plus an optional global bucket shared by
+every key. State is bounded whatever the number of senders:
+- buckets live in an OrderedDict in last-touched order
+- a bucket that has refilled completely is the same as no bucket, so
+  entries at the old end are dropped once they would be full again
+- past `max_keys`, the least recently touched bucket is evicted
+
+Every operation is O(1) amortized.
+
+With a shared-state backend, every hit is also written there in the
+background (expiring once the bucket would be full again), and load()
+pulls in keys unknown locally, so limits survive a restart or agent-loop
+failover to another worker. Checks only read local buckets, so they
+never wait on the store. The global bucket stays per process.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from shared_state import shared_get, shared_set
+
+
+class RateLimiter:
+    """Per-key (and optional global) token-bucket limits."""
+
+    def __init__(
+        self,
+        interval: float,
+        burst: int = 1,
+        global_interval: Optional[float] = None,
+        global_burst: int = 1,
+        max_keys: int = 10_000,
+        state=None,
+        namespace: str = "ratelimit",
+    ):
+        # One token every `interval` seconds, holding at most `burst`
+        self.interval = interval
+        self.burst = burst
+        self.global_interval = global_interval
+        self.global_burst = global_burst
+        self.max_keys = max_keys
+        self.state = state
+        self.namespace = namespace
+
+        # key -> [tokens, last update (monotonic)]
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self._global = [float(global_burst), time.monotonic()]
+
+        self.denied = 0
+        self.evicted = 0
+
+    def allowed(self, key: str) -> bool:
+        """Whether `key` may act now (nothing is consumed)."""
+        if self.retry_after(key) > 0:
+            self.denied += 1
+            return False
+        return True
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until `key` may act again (0 if it may act now)."""
+        now = time.monotonic()
+        self._expire(now)
+        wait = 0.0
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            wait = self._wait(bucket, self.interval, self.burst, now)
+        if self.global_interval:
+            wait = max(wait, self._wait(self._global, self.global_interval, self.global_burst, now))
+        return wait
+
+    def hit(self, key: str):
+        """Record that `key` acted, spending a token from its bucket."""
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None) or [float(self.burst), now]
+        self._spend(bucket, self.interval, self.burst, now)
+        self._buckets[key] = bucket  # re-insert at the recent end
+        if self.state is not None:
+            # Expires when the bucket would be full again, like locally
+            ttl = (self.burst - bucket[0]) * self.interval
+            if ttl > 0:
+                shared_set(self.state, self.namespace, key, json.dumps([bucket[0], time.time()]), ttl=ttl)
+        if self.global_interval:
+            self._spend(self._global, self.global_interval, self.global_burst, now)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+        self._expire(now)
+
+    async def load(self, key: str):
+        """Pull in `key`'s bucket from the shared state, unless held locally.
+
+        Call before checking a key this process may not have seen.
+        """
+        if self.state is None or key in self._buckets:
+            return
+        raw = await shared_get(self.state, self.namespace, key)
+        if raw is None or key in self._buckets:
+            return
+        tokens, wall = json.loads(raw)
+        # Wall-clock age, rebased onto this process's monotonic clock
+        now = time.monotonic()
+        self._buckets[key] = [tokens, now - max(0.0, time.time() - wall)]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> dict:
+        return {"tracked": len(self._buckets), "denied": self.denied, "evicted": self.evicted}
+
+    @staticmethod
+    def _refill(bucket: list, interval: float, burst: int, now: float):
+        if interval > 0:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) / interval)
+        else:
+            bucket[0] = burst
+        bucket[1] = now
+
+    def _wait(self, bucket: list, interval: float, burst: int, now: float) -> float:
+        self._refill(bucket, interval, burst, now)
+        return 0.0 if bucket[0] >= 1 else (1 - bucket[0]) * interval
+
+    def _spend(self, bucket: list, interval: float, burst: int, now: float):
+        self._refill(bucket, interval, burst, now)
+        # Acting while empty restarts the wait, like a "last acted" timestamp
+        bucket[0] = max(0.0, bucket[0] - 1)
+
+    def _expire(self, now: float):
+        """Drop buckets at the old end that have refilled completely."""
+        full_after = self.interval * self.burst
+        while self._buckets:
+            key, (tokens, updated) = next(iter(self._buckets.items()))
+            if updated + full_after > now:
+                break
+            del self._buckets[key]
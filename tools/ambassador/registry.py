@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Registry Client
+
+One pooled HTTP client for every registry call the agent makes, with:
+- connection-pool limits and keep-alive
+- optional HTTP/2 (needs the `h2` package)
+- explicit connect/read/write/pool timeouts
+- jittered exponential retries for idempotent calls
+- a latency histogram per endpoint
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from metrics import Counter, Histogram
+
+
+# Worth retrying: the registry or a proxy in front of it was briefly unavailable
+RETRY_STATUSES = {429, 502, 503, 504}
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# The request never reached the registry, so even a POST is safe to resend
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _env(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+class RegistryClient:
+    """httpx.AsyncClient wrapper with retries and per-endpoint latency."""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.retries = int(retries if retries is not None else _env("AMBASSADOR_REGISTRY_RETRIES", 3))
+        self.backoff_base = 0.25
+        self.backoff_max = 5.0
+
+        if http2 is None:
+            http2 = os.environ.get("AMBASSADOR_REGISTRY_HTTP2", "0") == "1"
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠ HTTP/2 requested but h2 is not installed; using HTTP/1.1", flush=True)
+                http2 = False
+
+        connect = connect_timeout or _env("AMBASSADOR_REGISTRY_CONNECT_TIMEOUT", 5)
+        read = read_timeout or _env("AMBASSADOR_REGISTRY_READ_TIMEOUT", 15)
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=http2,
+            transport=transport,
+            timeout=httpx.Timeout(connect=connect, read=read, write=read, pool=connect),
+            limits=httpx.Limits(
+                max_connections=int(max_connections or _env("AMBASSADOR_REGISTRY_MAX_CONNECTIONS", 20)),
+                max_keepalive_connections=int(max_keepalive or _env("AMBASSADOR_REGISTRY_MAX_KEEPALIVE", 10)),
+                keepalive_expiry=keepalive_expiry or _env("AMBASSADOR_REGISTRY_KEEPALIVE_EXPIRY", 30),
+            ),
+        )
+
+        self.latency = Histogram(
+            "ambassador_registry_request_seconds",
+            "Registry call latency per attempt",
+            label="endpoint",
+        )
+        self.errors = Counter(
+            "ambassador_registry_errors_total",
+            "Registry transport errors and 5xx responses",
+            label="endpoint",
+        )
+        self.retried = Counter(
+            "ambassador_registry_retries_total",
+            "Registry calls retried",
+            label="endpoint",
+        )
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: Optional[str] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request, retrying transient failures when it is safe.
+
+        `idempotent` defaults from the method; pass True for POSTs such as
+        presence heartbeats that can be repeated harmlessly. `endpoint`
+        overrides the latency label (default "METHOD /path").
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        label = endpoint or f"{method.upper()} {urlsplit(url).path}"
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                resp = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                self.latency.observe(time.perf_counter() - started, label)
+                self.errors.inc(label=label)
+                if attempt >= self.retries or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    raise
+            else:
+                self.latency.observe(time.perf_counter() - started, label)
+                if resp.status_code not in RETRY_STATUSES or not idempotent or attempt >= self.retries:
+                    if resp.status_code >= 500:
+                        self.errors.inc(label=label)
+                    return resp
+                retry_after = resp.headers.get("retry-after")
+
+            attempt += 1
+            self.retried.inc(label=label)
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honoring a short Retry-After."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def stats(self) -> dict:
+        """Latency percentiles, errors and retries per endpoint."""
+        latency = self.latency.summary()
+        return {
+            label: {
+                **summary,
+                "errors": int(self.errors.value(label)),
+                "retries": int(self.retried.value(label)),
+            }
+            for label, summary in latency.items()
+        }
+
+    def metrics(self) -> list:
+        return [self.latency, self.errors, self.retried]
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Model Scheduler
+
+One gate in front of every model call, with a global concurrency cap and
+priority classes, highest first:
+- inbox: replies to AIRC agents; never rejected, and one slot is kept
+  for them alone so a widget spike can't starve them
+- mcp: airc_ask from the MCP server
+- web: anonymous visitors on /api/chat and /ws/chat
+- background: memory summaries and other housekeeping
+
+Freed slots go to the highest waiting class, FIFO within a class. When a
+class's queue is full, or a caller has waited longer than its class
+allows, admission fails fast with Busy (and a Retry-After estimate)
+instead of letting queues grow without bound. Only the first call of an
+agent run can be rejected; later turns of an admitted run always wait.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from metrics import Counter
+
+
+PRIORITIES = ("inbox", "mcp", "web", "background")
+
+
+class Busy(Exception):
+    """No model capacity right now; try again after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"model capacity exhausted, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ModelScheduler:
+    """Global model-call concurrency cap with priority classes."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        reserved: int = 1,
+        queue_limits: Optional[dict] = None,
+        max_wait: Optional[dict] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        # Slots only the inbox may use
+        self.reserved = min(reserved, max_concurrent - 1)
+        # Waiters allowed per class before new arrivals are rejected
+        self.queue_limits = {"mcp": 8, "web": 16, **(queue_limits or {})}
+        # Seconds a rejectable caller may wait for a slot
+        self.max_wait = {"mcp": 30.0, "web": 10.0, **(max_wait or {})}
+
+        self._active = 0
+        self._waiting: dict[str, deque] = {p: deque() for p in PRIORITIES}
+        self._hold = 2.0  # Moving average of seconds a slot is held
+
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.rejected = Counter(
+            "ambassador_model_calls_rejected_total",
+            "Model runs refused admission",
+            label="priority",
+        )
+        for priority in PRIORITIES:
+            self.rejected.inc(0, label=priority)  # Export zeros, not gaps
+
+    @asynccontextmanager
+    async def slot(self, priority: str, reject: bool = True):
+        """Hold one model-call slot; raises Busy if `reject` and saturated."""
+        await self.acquire(priority, reject)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold = 0.8 * self._hold + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    async def acquire(self, priority: str, reject: bool = True):
+        if priority not in self._waiting:
+            raise ValueError(f"unknown priority {priority!r}")
+
+        ahead = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        if self._can_start(priority) and not any(self._waiting[p] for p in ahead):
+            self._active += 1
+            self.admitted[priority] += 1
+            return
+
+        limit = self.queue_limits.get(priority)
+        if reject and limit is not None and len(self._waiting[priority]) >= limit:
+            self.rejected.inc(label=priority)
+            raise Busy(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting[priority].append(waiter)
+        timeout = self.max_wait.get(priority) if reject else None
+        try:
+            # Shielded so a timeout can't cancel a slot being handed over
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                self.release()  # Granted just as we gave up: pass it on
+            else:
+                waiter.cancel()
+                self._waiting[priority].remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected.inc(label=priority)
+                raise Busy(self.retry_after()) from None
+            raise
+        self.admitted[priority] += 1
+
+    def release(self):
+        self._active -= 1
+        for priority in PRIORITIES:
+            queue = self._waiting[priority]
+            while queue and self._can_start(priority):
+                waiter = queue.popleft()
+                if not waiter.done():
+                    self._active += 1
+                    waiter.set_result(None)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new caller would get a slot."""
+        waiting = sum(len(q) for q in self._waiting.values())
+        return max(1, math.ceil(self._hold * (1 + waiting / self.max_concurrent)))
+
+    def _can_start(self, priority: str) -> bool:
+        limit = self.max_concurrent if priority == "inbox" else self.max_concurrent - self.reserved
+        return self._active < limit
+
+    def active(self) -> int:
+        return self._active
+
+    def waiting(self) -> dict:
+        return {p: len(q) for p, q in self._waiting.items()}
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self._active,
+            "waiting": self.waiting(),
+            "admitted": dict(self.admitted),
+            "rejected": {p: int(self.rejected.value(p)) for p in PRIORITIES},
+            "hold_ms": round(self._hold * 1000),
+        }
@@ -12,17 +12,23 @@ Exposes the ambassador via:
 import asyncio
 import json
 import os
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import AsyncIterator
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from agent import AmbassadorAgent, handle_web_chat
+from leader import Lease, lead
+from scheduler import Busy
+from shared_state import flush_writes
+from metrics import CONTENT_TYPE, Gauge, Histogram, exposition
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -31,24 +37,39 @@ from agent import AmbassadorAgent, handle_web_chat
 
 ambassador: AmbassadorAgent = None
 agent_task: asyncio.Task = None
+lease: Lease = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Start ambassador agent on startup."""
-    global ambassador, agent_task
+    global ambassador, agent_task, lease
 
     ambassador = AmbassadorAgent()
-
-    # Start agent loop in background
-    agent_task = asyncio.create_task(ambassador.start())
+    ambassador.knowledge.start_watching()
+
+    # Every worker answers web chat; only the lease holder runs the
+    # agent loop (inbox + heartbeats), so N workers never double-reply
+    lease = Lease(
+        os.environ.get("AMBASSADOR_LEASE_DB") or ambassador.memory.path,
+        ttl=float(os.environ.get("AMBASSADOR_LEASE_TTL", 15)),
+    )
+    agent_task = asyncio.create_task(lead(lease, ambassador.start))
     print("✓ Ambassador agent started")
+    lag_task = asyncio.create_task(monitor_loop_lag())
 
     yield
 
-    # Cleanup
+    # Cleanup: hand the lease over promptly
+    lag_task.cancel()
     if agent_task:
         agent_task.cancel()
+        await asyncio.gather(agent_task, return_exceptions=True)
+    lease.close()
+    await flush_writes()  # Background answer/rate-limit writes
+    ambassador.state.close()
+    await ambassador.http.aclose()
+    await ambassador.tracer.aclose()
 
 
 app = FastAPI(
@@ -70,6 +91,23 @@ app.add_middleware(
 # Health Check
 # ─────────────────────────────────────────────────────────────────
 
+# Note stats scan the whole memory table; probes reuse them for a while
+MEMORY_STATS_TTL = 10.0
+_memory_stats_memo: tuple[float, dict] = (0.0, {})
+
+
+async def memory_stats() -> dict:
+    """ambassador.memory.note_stats(), computed at most every MEMORY_STATS_TTL."""
+    global _memory_stats_memo
+
+    expires, cached = _memory_stats_memo
+    if expires > time.monotonic():
+        return cached
+    stats = await ambassador.memory.note_stats()
+    _memory_stats_memo = (time.monotonic() + MEMORY_STATS_TTL, stats)
+    return stats
+
+
 @app.get("/health")
 async def health():
     """Health check for deployment."""
@@ -77,10 +115,60 @@ async def health():
         "status": "healthy",
         "agent": "ambassador",
         "protocol": "airc",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "agent_loop": lease.stats() if lease else None,
+        "event_loop": loop_lag.summary().get("", {}),
+        "websockets": int(ws_connections.value()),
+        "inbox": ambassador.inbox_stats() if ambassador else None,
+        "heartbeat": ambassador.heartbeat_stats() if ambassador else None,
+        "registry": ambassador.http.stats() if ambassador else None,
+        "presence": ambassador.presence.stats() if ambassador else None,
+        "usage": ambassador.usage_totals if ambassador else None,
+        "answer_cache": ambassador.answer_cache.stats() if ambassador else None,
+        "chat_flights": ambassador.chat_flights.stats() if ambassador else None,
+        "scheduler": ambassador.scheduler.stats() if ambassador else None,
+        "memory": await memory_stats() if ambassador else None
     }
 
 
+# ─────────────────────────────────────────────────────────────────
+# Metrics
+# ─────────────────────────────────────────────────────────────────
+
+chat_latency = Histogram(
+    "ambassador_chat_request_seconds",
+    "Web chat latency from question to full answer",
+    label="endpoint",
+)
+ws_connections = Gauge(
+    "ambassador_websocket_connections",
+    "Open /ws/chat connections",
+)
+loop_lag = Histogram(
+    "ambassador_event_loop_lag_seconds",
+    "How late a periodic event-loop tick fires",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+async def monitor_loop_lag(interval: float = 0.1):
+    """Sample event-loop lag: anything blocking the loop delays this tick."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        loop_lag.observe(max(0.0, loop.time() - expected))
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint."""
+    series = [chat_latency, ws_connections, loop_lag]
+    if ambassador:
+        series += ambassador.metrics()
+    return Response(exposition(series), media_type=CONTENT_TYPE)
+
+
 # ─────────────────────────────────────────────────────────────────
 # REST API
 # ─────────────────────────────────────────────────────────────────
@@ -100,48 +188,136 @@ async def chat(request: ChatRequest):
     if not ambassador:
         raise HTTPException(503, "Agent not ready")
 
-    response = await handle_web_chat(request.message, ambassador)
+    started = time.perf_counter()
+    try:
+        response = await handle_web_chat(request.message, ambassador)
+    except Busy as e:
+        # Shed load now rather than queue visitors behind agent replies
+        raise HTTPException(429, "Ambassador is busy", headers={"Retry-After": str(e.retry_after)})
+    chat_latency.observe(time.perf_counter() - started, "/api/chat")
 
     # Track conversation for feed
-    track_conversation("web_visitor", request.message, response)
+    await track_conversation("web_visitor", request.message, response)
 
     return ChatResponse(from_="ambassador", body=response)
 
 
+async def stream_chat(message: str, endpoint: str) -> AsyncIterator[tuple[str, dict]]:
+    """Yield ("delta", ...) events as the answer streams, then ("done", ...)."""
+    deltas: asyncio.Queue = asyncio.Queue()
+    started = time.perf_counter()
+    ttft_ms = None
+
+    task = asyncio.create_task(
+        handle_web_chat(message, ambassador, on_delta=deltas.put)
+    )
+    task.add_done_callback(lambda _: deltas.put_nowait(None))
+
+    try:
+        while (text := await deltas.get()) is not None:
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - started) * 1000)
+            yield "delta", {"delta": text}
+
+        response = task.result()
+        chat_latency.observe(time.perf_counter() - started, endpoint)
+        yield "done", {
+            "body": response,
+            "ttft_ms": ttft_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000)
+        }
+    finally:
+        # Client went away mid-stream: stop generating
+        if not task.done():
+            task.cancel()
+
+
+def busy_frame(e: Busy) -> dict:
+    return {
+        "body": f"I'm answering a lot of questions right now. Please try again in {e.retry_after}s.",
+        "retry_after": e.retry_after,
+    }
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Server-Sent Events variant of /api/chat that streams answer tokens."""
+    if not ambassador:
+        raise HTTPException(503, "Agent not ready")
+
+    async def events():
+        try:
+            async for event, data in stream_chat(request.message, "/api/chat/stream"):
+                if event == "done":
+                    await track_conversation("web_visitor", request.message, data["body"])
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Busy as e:
+            yield f"event: busy\ndata: {json.dumps(busy_frame(e))}\n\n"
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': 'stream failed'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ─────────────────────────────────────────────────────────────────
 # Conversation Feed (for airc.chat)
 # ─────────────────────────────────────────────────────────────────
 
-# In-memory store for recent conversations (last 20)
-recent_conversations: list = []
+# Recent conversations (last 20) live in the agent's shared state, so
+# every worker shows the same feed. Each worker memoizes the feed briefly
+# so polling clients don't each go to the store.
 MAX_CONVERSATIONS = 20
+FEED_MEMO_TTL = 1.0
+_feed_memo: tuple[float, dict] = (0.0, {})
 
 
-def track_conversation(sender: str, question: str, answer: str):
+async def track_conversation(sender: str, question: str, answer: str):
     """Track a conversation for the public feed."""
+    global _feed_memo
+
     # Truncate for display
     q_short = question[:100] + "..." if len(question) > 100 else question
     a_short = answer[:150] + "..." if len(answer) > 150 else answer
 
-    recent_conversations.insert(0, {
+    entry = json.dumps({
         "from": sender,
         "question": q_short,
         "answer": a_short,
         "timestamp": datetime.now().isoformat()
     })
-
-    # Keep only recent
-    while len(recent_conversations) > MAX_CONVERSATIONS:
-        recent_conversations.pop()
+    try:
+        await asyncio.to_thread(ambassador.state.append, "feed", entry, MAX_CONVERSATIONS)
+    except Exception as e:
+        print(f"Feed update failed: {e}", flush=True)  # The answer still goes out
+    _feed_memo = (0.0, {})
 
 
 @app.get("/api/feed")
 async def feed():
     """Public feed of recent ambassador conversations."""
-    return {
-        "conversations": recent_conversations[:10],
-        "count": len(recent_conversations)
-    }
+    global _feed_memo
+
+    if not ambassador:
+        return {"conversations": [], "count": 0}
+
+    expires, cached = _feed_memo
+    if expires > time.monotonic():
+        return cached
+
+    def load():
+        return {
+            "conversations": [json.loads(e) for e in ambassador.state.recent("feed", 10)],
+            "count": ambassador.state.count("feed")
+        }
+
+    result = await asyncio.to_thread(load)
+    _feed_memo = (time.monotonic() + FEED_MEMO_TTL, result)
+    return result
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -159,6 +335,7 @@ async def websocket_chat(websocket: WebSocket):
         "body": "Hey! I'm the AIRC Ambassador. Ask me anything about the protocol, integration, or how AIRC compares to other standards."
     })
 
+    ws_connections.inc()
     try:
         while True:
             data = await websocket.receive_json()
@@ -167,7 +344,19 @@ async def websocket_chat(websocket: WebSocket):
             if not message:
                 continue
 
-            response = await handle_web_chat(message, ambassador)
+            try:
+                # Clients opt in to delta frames; others get one full answer
+                if data.get("stream"):
+                    async for event, payload in stream_chat(message, "/ws/chat"):
+                        await websocket.send_json({"from": "ambassador", "type": event, **payload})
+                    continue
+
+                started = time.perf_counter()
+                response = await handle_web_chat(message, ambassador)
+                chat_latency.observe(time.perf_counter() - started, "/ws/chat")
+            except Busy as e:
+                await websocket.send_json({"from": "ambassador", "type": "busy", **busy_frame(e)})
+                continue
 
             await websocket.send_json({
                 "from": "ambassador",
@@ -178,6 +367,8 @@ async def websocket_chat(websocket: WebSocket):
         pass
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        ws_connections.dec()
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -375,13 +566,25 @@ WIDGET_HTML = """<!DOCTYPE html>
         const sendBtn = document.getElementById('send');
         let ws = null;
         let firstMsg = true;
+        let streaming = null;
 
         function connect() {
             ws = new WebSocket(ENDPOINT);
             ws.onopen = () => { sendBtn.disabled = false; };
             ws.onmessage = (e) => {
+                const data = JSON.parse(e.data);
                 removeTyping();
-                addMessage('ambassador', JSON.parse(e.data).body);
+                if (data.type === 'delta') {
+                    if (!streaming) streaming = { div: addMessage('ambassador', ''), text: '' };
+                    streaming.text += data.delta;
+                    render(streaming.div, streaming.text);
+                } else if (data.type === 'done') {
+                    if (streaming) render(streaming.div, data.body);
+                    else addMessage('ambassador', data.body);
+                    streaming = null;
+                } else {
+                    addMessage('ambassador', data.body);
+                }
             };
             ws.onclose = () => {
                 sendBtn.disabled = true;
@@ -396,12 +599,17 @@ WIDGET_HTML = """<!DOCTYPE html>
             }
             const div = document.createElement('div');
             div.className = 'message ' + from;
+            messages.appendChild(div);
+            render(div, body);
+            return div;
+        }
+
+        function render(div, body) {
             div.innerHTML = body
                 .replace(/```(\\w*)\\n?([\\s\\S]*?)```/g, '<pre>$2</pre>')
                 .replace(/`([^`]+)`/g, '<code>$1</code>')
                 .replace(/\\*\\*([^*]+)\\*\\*/g, '<strong>$1</strong>')
                 .replace(/\\n/g, '<br>');
-            messages.appendChild(div);
             messages.scrollTop = messages.scrollHeight;
         }
 
@@ -423,7 +631,7 @@ WIDGET_HTML = """<!DOCTYPE html>
             const text = input.value.trim();
             if (!text || !ws || ws.readyState !== 1) return;
             addMessage('user', text);
-            ws.send(JSON.stringify({ message: text }));
+            ws.send(JSON.stringify({ message: text, stream: true }));
             input.value = '';
             addTyping();
         }
@@ -485,4 +693,9 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.environ.get("AMBASSADOR_WORKERS", 1))
+    if workers > 1:
+        # Worker processes import the app themselves
+        uvicorn.run("server:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Shared State
+
+Small key/value and capped-log store for state every server worker should
+agree on: the public feed, cached web answers and rate-limit buckets.
+Backends share one interface:
+- SQLiteState (default): a WAL database on local disk, so every process
+  on the machine sees the same data; the memory database by default
+- MemoryState: plain dicts, for a single process or tests
+
+Callers keep a local first tier (LRU, memo) and only reach the store on
+a miss or a write, so the common path never leaves the process.
+
+Values are strings (callers serialize); expiry uses wall-clock time so it
+means the same thing in every process.
+
+Backend calls block (SQLite may wait up to 5s for a writer's lock), so
+code on the event loop uses shared_get, which runs in a thread, and
+shared_set, which writes behind without waiting (flush_writes waits for
+those before the store is closed). Both log store errors
+instead of raising them: shared state is an optimization, and a locked
+database must not fail a request.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Optional
+
+
+class MemoryState:
+    """In-process backend: fast, but private to one worker."""
+
+    # Expired entries are purged every this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self):
+        self._kv: dict[str, OrderedDict] = {}
+        self._logs: dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._kv.get(namespace, {}).get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._kv[namespace][key]
+                return None
+            return value
+
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._kv.setdefault(namespace, OrderedDict())[key] = (value, expires_at)
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                now = time.time()
+                for entries in self._kv.values():
+                    for stale in [k for k, (_, exp) in entries.items() if exp is not None and exp < now]:
+                        del entries[stale]
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._kv.get(namespace, {}).pop(key, None)
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._kv.pop(namespace, None)
+            self._logs.pop(namespace, None)
+
+    def append(self, namespace: str, value: str, keep: int):
+        with self._lock:
+            log = self._logs.get(namespace)
+            if log is None or log.maxlen != keep:
+                log = self._logs[namespace] = deque(log or (), maxlen=keep)
+            log.appendleft(value)
+
+    def recent(self, namespace: str, limit: int) -> list[str]:
+        with self._lock:
+            return list(self._logs.get(namespace, ()))[:limit]
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._logs.get(namespace, ()))
+
+    def close(self):
+        pass
+
+
+class SQLiteState:
+    """SQLite backend shared by every process using the same file."""
+
+    # Expired rows are purged every this many writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_kv ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_log ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, value TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS shared_log_ns ON shared_log (namespace, id)")
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM shared_kv WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, value, expires_at)
+            )
+            self._wrote()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM shared_kv WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_kv WHERE namespace = ?", (namespace,))
+            self._conn.execute("DELETE FROM shared_log WHERE namespace = ?", (namespace,))
+
+    def append(self, namespace: str, value: str, keep: int):
+        """Add `value` to a newest-first log holding at most `keep` entries."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO shared_log (namespace, value) VALUES (?, ?)", (namespace, value)
+                )
+                self._conn.execute(
+                    "DELETE FROM shared_log WHERE namespace = ? AND id NOT IN"
+                    " (SELECT id FROM shared_log WHERE namespace = ? ORDER BY id DESC LIMIT ?)",
+                    (namespace, namespace, keep)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def recent(self, namespace: str, limit: int) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT value FROM shared_log WHERE namespace = ? ORDER BY id DESC LIMIT ?",
+                (namespace, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM shared_log WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _wrote(self):
+        # Called with the lock held
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._conn.execute(
+                "DELETE FROM shared_kv WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+
+
+def open_state(default_path: Path):
+    """The backend named by AMBASSADOR_STATE ("sqlite", the default, or "memory")."""
+    backend = os.environ.get("AMBASSADOR_STATE", "sqlite").strip().lower()
+    if backend == "memory":
+        return MemoryState()
+    if backend != "sqlite":
+        raise ValueError(f"Unknown AMBASSADOR_STATE backend: {backend!r}")
+    return SQLiteState(os.environ.get("AMBASSADOR_STATE_DB") or default_path)
+
+
+# shared_set writes still running; awaited by flush_writes before close
+_pending: set = set()
+
+
+async def shared_get(state, namespace: str, key: str) -> Optional[str]:
+    """state.get in a worker thread; None if the store fails."""
+    try:
+        return await asyncio.to_thread(state.get, namespace, key)
+    except Exception as e:
+        print(f"Shared state read failed: {e}", flush=True)
+        return None
+
+
+def shared_set(state, namespace: str, key: str, value: str, ttl: Optional[float] = None):
+    """state.set in a worker thread, without waiting for it.
+
+    Outside an event loop the write happens inline. Writes are not
+    ordered; the last one to land wins.
+    """
+    def write():
+        try:
+            state.set(namespace, key, value, ttl=ttl)
+        except Exception as e:
+            print(f"Shared state write failed: {e}", flush=True)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        write()
+        return
+    future = loop.run_in_executor(None, write)
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+
+
+async def flush_writes():
+    """Wait for every shared_set write still in progress."""
+    while _pending:
+        await asyncio.gather(*_pending)
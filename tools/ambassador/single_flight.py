@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Single-Flight
+
+Shares one in-flight computation among callers asking for the same key.
+Web chat uses it so that a burst of visitors asking "What is AIRC?" while
+the first answer is still being written costs one agent run, not dozens.
+
+Followers that stream get the deltas the leader has produced so far, then
+the rest live. The shared run is only cancelled once every caller waiting
+on it has gone away.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+OnDelta = Callable[[str], Awaitable[None]]
+
+
+class _Flight:
+    """One shared run, its deltas so far and the callers following it."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.deltas: list[str] = []
+        self.listeners: list[OnDelta] = []
+        self.waiters = 0
+
+    async def publish(self, text: str):
+        self.deltas.append(text)
+        for listener in list(self.listeners):
+            await listener(text)
+
+    async def join(self, on_delta: Optional[OnDelta]) -> str:
+        if on_delta:
+            # Catch up, then listen; no await between the last replayed
+            # delta and registering, so nothing is missed or reordered
+            replayed = 0
+            while replayed < len(self.deltas):
+                await on_delta(self.deltas[replayed])
+                replayed += 1
+            self.listeners.append(on_delta)
+
+        self.waiters += 1
+        try:
+            answer = await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.waiters == 1 and not self.task.done():
+                self.task.cancel()  # Nobody left to answer
+            raise
+        finally:
+            self.waiters -= 1
+            if on_delta:
+                self.listeners.remove(on_delta)
+
+        if on_delta and not self.deltas and answer:
+            # The run wasn't streamed: deliver the answer in one piece
+            await on_delta(answer)
+        return answer
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one run."""
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[Optional[OnDelta]], Awaitable[str]],
+        on_delta: Optional[OnDelta] = None,
+    ) -> str:
+        """Return `compute`'s result, joining an identical run if one is in flight.
+
+        `compute` receives a delta callback when the first caller wants
+        deltas, and None otherwise.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(compute(flight.publish if on_delta else None))
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await flight.join(on_delta)
+
+    def _finish(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # Retrieved, even if every waiter left
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The ambassador is a set of flat scripts; make them importable from tests.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def isolated_memory(tmp_path, monkeypatch):
+    """Keep agents created by tests away from the real memory.db."""
+    monkeypatch.setenv("AMBASSADOR_MEMORY_DB", str(tmp_path / "memory.db"))
@@ -0,0 +1,94 @@
+"""Local stand-ins for the Anthropic client used by the tests."""
+
+import asyncio
+from types import SimpleNamespace
+
+
+def usage(input_tokens: int = 100, output_tokens: int = 20, cache_read: int = 0, cache_write: int = 0):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_read_input_tokens=cache_read,
+        cache_creation_input_tokens=cache_write,
+    )
+
+
+class StubMessages:
+    """Stands in for `AsyncAnthropic().messages` with a fixed latency.
+
+    With `tool_calls`, the first turn asks for those tools and the reply
+    follows on the next turn.
+    """
+
+    def __init__(self, latency: float, reply: str, tool_calls: list = None):
+        self.latency = latency
+        self.reply = reply
+        self.tool_calls = tool_calls or []
+        self.calls = 0
+        self.requests: list[dict] = []
+        self.prompts: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    def _response(self, request: dict):
+        self.calls += 1
+        self.requests.append(request)
+        if len(request["messages"]) == 1:
+            self.prompts.append(request["messages"][0]["content"])
+
+        if self.tool_calls and len(request["messages"]) == 1:
+            return SimpleNamespace(
+                stop_reason="tool_use",
+                content=[
+                    SimpleNamespace(type="tool_use", id=f"toolu_{i}", name=name, input=args)
+                    for i, (name, args) in enumerate(self.tool_calls)
+                ],
+                usage=usage(cache_write=1500),
+            )
+        return SimpleNamespace(
+            stop_reason="end_turn",
+            content=[SimpleNamespace(type="text", text=self.reply)],
+            usage=usage(cache_read=1500),
+        )
+
+    async def create(self, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        return self._response(kwargs)
+
+    def stream(self, **kwargs):
+        return StubStream(self, kwargs)
+
+
+class StubStream:
+    """Mimics `messages.stream(...)`: the reply arrives word by word."""
+
+    def __init__(self, messages: StubMessages, request: dict):
+        self.messages = messages
+        self.request = request
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        words = self.messages.reply.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.messages.latency / len(words))
+            yield word if i == 0 else " " + word
+
+    async def get_final_message(self):
+        return self.messages._response(self.request)
+
+
+class StubClaude:
+    def __init__(self, latency: float = 0.3, reply: str = "AIRC is the social layer for agents.",
+                 tool_calls: list = None):
+        self.messages = StubMessages(latency, reply, tool_calls)
@@ -0,0 +1,64 @@
+"""Answer cache tests."""
+
+import asyncio
+import os
+import time
+
+from agent import AmbassadorAgent, handle_web_chat
+from answer_cache import AnswerCache, normalize_question
+from knowledge import KnowledgeBase
+from stubs import StubClaude
+
+
+def test_normalize_question():
+    assert normalize_question("What is AIRC?") == "what is airc"
+    assert normalize_question("  what   is airc ?! ") == "what is airc"
+    assert normalize_question("vs A2A") == normalize_question("VS a2a.")
+
+
+def test_lru_and_ttl(tmp_path):
+    cache = AnswerCache(KnowledgeBase(tmp_path), max_entries=2, ttl=60)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+    cache.ttl = -1
+    cache.put("d", "D")
+    assert cache.get("d") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_knowledge_change_invalidates(tmp_path):
+    doc = tmp_path / "faq" / "FAQ.md"
+    doc.parent.mkdir()
+    doc.write_text("v1")
+    kb = KnowledgeBase(tmp_path)
+    cache = AnswerCache(kb)
+    cache.put("What is AIRC?", "v1 answer")
+    assert cache.get("what is airc") == "v1 answer"
+
+    doc.write_text("v2")
+    os.utime(doc, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert kb.reload()
+    assert cache.get("what is airc") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_web_chat_hits_skip_the_model():
+    claude = StubClaude(latency=0.2)
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+
+    async def ask(question):
+        start = time.perf_counter()
+        answer = await handle_web_chat(question, agent)
+        return answer, time.perf_counter() - start
+
+    first, _ = asyncio.run(ask("What is AIRC?"))
+    second, elapsed = asyncio.run(ask("what is airc"))
+
+    assert first == second
+    assert claude.messages.calls == 1
+    assert elapsed < 0.01
@@ -0,0 +1,34 @@
+"""Offline performance regression checks, using bench_agent's fakes."""
+
+import asyncio
+
+from bench_agent import bench_chat, bench_inbox, percentile
+
+TURN = 0.02  # fake model seconds per turn
+ROUNDS = [["search_knowledge"]]  # one tool round, so two turns per answer
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+
+def test_inbox_throughput_scales_with_concurrency():
+    serial = asyncio.run(bench_inbox(1, messages=16, senders=16, latency=TURN, tool_rounds=ROUNDS))
+    parallel = asyncio.run(bench_inbox(8, messages=16, senders=16, latency=TURN, tool_rounds=ROUNDS))
+
+    assert serial["replied"] == parallel["replied"] == 16
+    assert parallel["model_calls"] == 32
+    assert parallel["throughput_per_s"] > 4 * serial["throughput_per_s"]
+    # Two batches of two turns each, plus overhead
+    assert parallel["reply_p99_ms"] < 2 * 2 * TURN * 1000 * 3
+
+
+def test_chat_latency_stays_flat_under_concurrency():
+    result = asyncio.run(bench_chat(8, requests=16, latency=TURN, tool_rounds=ROUNDS))
+
+    assert result["errors"] == 0
+    # Visitors don't queue behind each other: about two model turns each
+    assert result["chat_p50_ms"] < 2 * TURN * 1000 * 3
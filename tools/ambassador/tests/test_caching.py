@@ -0,0 +1,28 @@
+"""Prompt caching tests for the agent loop."""
+
+import asyncio
+
+from agent import AmbassadorAgent
+from stubs import StubClaude
+
+
+def test_stable_prefix_is_cached_and_usage_recorded():
+    claude = StubClaude(latency=0, tool_calls=[("read_knowledge", {"topic": "faq"})])
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+
+    answer = asyncio.run(agent._run_agent("What is AIRC?"))
+
+    assert answer == claude.messages.reply
+    first, second = claude.messages.requests
+    assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert first["system"] is second["system"]
+
+    # Only the newest tool results carry a message breakpoint
+    assert isinstance(first["messages"][0]["content"], str)
+    assert second["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+
+    record = agent.usage_log[-1]
+    assert record["model_calls"] == 2
+    assert record["cache_creation_input_tokens"] == 1500
+    assert record["cache_read_input_tokens"] == 1500
+    assert agent.usage_totals["requests"] == 1
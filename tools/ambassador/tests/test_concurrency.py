@@ -0,0 +1,39 @@
+"""Concurrency tests for the ambassador web endpoints."""
+
+import asyncio
+import time
+
+import httpx
+
+import server
+from agent import AmbassadorAgent
+from stubs import StubClaude
+
+
+MODEL_LATENCY = 0.3
+
+
+def test_concurrent_chats_do_not_serialize(monkeypatch):
+    claude = StubClaude(latency=MODEL_LATENCY)
+    agent = AmbassadorAgent(registry="http://registry.invalid", claude=claude)
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    async def run(n: int) -> float:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/api/chat", json={"message": f"question {i}"})
+                for i in range(n)
+            ])
+            elapsed = time.perf_counter() - start
+        assert all(r.status_code == 200 for r in responses)
+        assert all(r.json()["body"] for r in responses)
+        return elapsed
+
+    n = 10
+    elapsed = asyncio.run(run(n))
+
+    assert claude.messages.calls == n
+    # Serialized calls would take n * latency; concurrent ones about one latency.
+    assert elapsed < MODEL_LATENCY * 3
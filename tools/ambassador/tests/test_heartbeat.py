@@ -0,0 +1,40 @@
+"""Heartbeat scheduling tests."""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from agent import AmbassadorAgent
+from registry import RegistryClient
+from stubs import StubClaude
+
+
+def test_heartbeats_continue_during_slow_inbox_work(monkeypatch):
+    monkeypatch.setenv("AMBASSADOR_HEARTBEAT_INTERVAL", "0.1")
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=2))
+    agent.last_scan = datetime.now()  # skip the GitHub landscape scan
+    beats = []
+    inbox = [{"id": "m1", "from": "alice", "text": "slow question", "timestamp": 1}]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/presence":
+            beats.append(request)
+        if request.url.path == "/api/messages" and request.method == "GET":
+            return httpx.Response(200, json={"inbox": inbox})
+        return httpx.Response(200, json={})
+
+    agent.http = RegistryClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        loop = asyncio.create_task(agent._loop())
+        await asyncio.sleep(0.65)
+        loop.cancel()
+        return agent.inbox_stats()
+
+    stats = asyncio.run(run())
+    assert stats["in_flight"] == 1  # model call still running
+    assert 5 <= len(beats) <= 8
+    hb = agent.heartbeat_stats()
+    assert hb["sent"] == len(beats) and hb["failures"] == 0
+    assert hb["interval_s"] == 0.1
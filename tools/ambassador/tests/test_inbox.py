@@ -0,0 +1,204 @@
+"""Inbox worker pool and incremental fetch tests."""
+
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+import httpx
+
+from agent import AmbassadorAgent
+from leader import Lease, lead
+from registry import RegistryClient
+from memory_store import MemoryStore
+from ratelimit import RateLimiter
+from stubs import StubClaude
+
+
+class StubRegistry:
+    """Inbox endpoint honoring ?since= (inclusive) and ?limit=."""
+
+    def __init__(self, inbox: list):
+        self.inbox = inbox
+        self.deleted = []
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET" and request.url.path == "/api/messages":
+            self.requests.append(dict(request.url.params))
+            since = request.url.params.get("since")
+            limit = int(request.url.params.get("limit", 10**6))
+            page = [m for m in self.inbox if since is None or m["timestamp"] >= int(since)]
+            return httpx.Response(200, json={"inbox": page[:limit]})
+        if request.method == "DELETE":
+            msg_id = json.loads(request.content)["messageId"]
+            self.deleted.append(msg_id)
+            self.inbox = [m for m in self.inbox if m["id"] != msg_id]
+        return httpx.Response(200, json={})
+
+
+def make_agent(inbox: list, concurrency: int = 4, memory: MemoryStore = None):
+    claude = StubClaude(latency=0.05)
+    agent = AmbassadorAgent(
+        registry="http://registry.test", claude=claude,
+        inbox_concurrency=concurrency, memory=memory,
+    )
+    agent.reply_limiter = RateLimiter(interval=0)
+    registry = StubRegistry(inbox)
+    agent.http = RegistryClient(transport=httpx.MockTransport(registry.handler))
+    return agent, claude, registry
+
+
+def msg(msg_id: str, sender: str, timestamp: int = 0) -> dict:
+    return {"id": msg_id, "from": sender, "text": f"message {msg_id}", "timestamp": timestamp}
+
+
+def test_senders_run_in_parallel_and_in_order():
+    inbox = [msg("a1", "alice"), msg("b1", "bob"), msg("a2", "alice"),
+             msg("c1", "carol"), msg("a3", "alice"), msg("b2", "bob")]
+    agent, claude, registry = make_agent(inbox, concurrency=2)
+
+    async def run():
+        await agent._process_inbox()
+        stats = agent.inbox_stats()
+        # A second poll while work is pending must not double-queue
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats["queue_depth"] + stats["in_flight"] == len(inbox)
+    assert claude.messages.calls == len(inbox)
+    assert claude.messages.peak == 2
+    assert sorted(registry.deleted) == sorted(m["id"] for m in inbox)
+
+    alice = [p for p in claude.messages.prompts if "@alice" in p]
+    assert [p.split("message ")[1][:2] for p in alice] == ["a1", "a2", "a3"]
+    assert agent.inbox_stats()["in_flight"] == 0
+
+
+def test_cursor_pages_backlog_and_persists(tmp_path):
+    store = MemoryStore(tmp_path / "memory.db", legacy_json=None)
+    backlog = [msg(f"m{i}", f"sender{i}", timestamp=1000 + i) for i in range(120)]
+    agent, claude, registry = make_agent(list(backlog), concurrency=8, memory=store)
+
+    async def poll():
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+
+    asyncio.run(poll())
+    assert claude.messages.calls == 120
+    assert [r.get("limit") for r in registry.requests] == ["50", "50", "50"]
+    assert agent.inbox_stats()["cursor"] == 1119
+
+    # Next poll asks only for what is new since the cursor
+    registry.inbox.append(msg("late", "dave", timestamp=2000))
+    registry.requests.clear()
+    asyncio.run(poll())
+    assert registry.requests == [{"user": "ambassador", "limit": "50", "since": "1119"}]
+    assert agent.inbox_stats()["last_poll"]["messages"] == 1
+    assert claude.messages.calls == 121
+
+    # A restarted agent resumes from the persisted cursor
+    fresh, _, registry2 = make_agent([], memory=store)
+    asyncio.run(fresh._process_inbox())
+    assert registry2.requests[0]["since"] == "2000"
+
+
+def test_failed_message_is_retried_and_holds_the_cursor(tmp_path):
+    store = MemoryStore(tmp_path / "memory.db", legacy_json=None)
+    agent, claude, registry = make_agent([msg("m1", "alice", timestamp=1)], memory=store)
+    agent.inbox_retry_base = 0.1
+
+    failures = [RuntimeError("overloaded")]
+    handle = agent._handle_message
+
+    async def flaky(message):
+        if failures:
+            raise failures.pop()
+        await handle(message)
+
+    agent._handle_message = flaky
+
+    async def run():
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+        assert registry.deleted == []
+        assert agent.inbox_stats()["deferred"] == 1
+
+        # Newer traffic moves the fetch cursor, not the persisted one
+        registry.inbox.append(msg("b1", "bob", timestamp=5))
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+        assert json.loads(await store.get_meta("inbox_cursor")) == 1
+
+        await agent._deferred_task
+        await asyncio.gather(*agent._inbox_workers)
+        await agent._process_inbox()
+        return json.loads(await store.get_meta("inbox_cursor"))
+
+    assert asyncio.run(run()) == 5
+    assert sorted(registry.deleted) == ["b1", "m1"]
+    assert claude.messages.calls == 2
+
+
+def test_rate_limited_burst_is_deferred_and_coalesced():
+    agent, claude, registry = make_agent([msg("a1", "alice", timestamp=1)])
+    agent.reply_limiter = RateLimiter(interval=0.3)
+
+    async def run():
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+
+        # Burst while alice is rate-limited: held locally, not handled yet
+        registry.inbox += [msg("a2", "alice", timestamp=2), msg("a3", "alice", timestamp=3)]
+        assert await agent._process_inbox() == 2
+        assert agent.inbox_stats()["deferred"] == 2
+        assert claude.messages.calls == 1
+
+        # Later polls start past the burst instead of re-downloading it
+        await agent._process_inbox()
+        assert registry.requests[-1]["since"] == "3"
+
+        await agent._deferred_task
+        await asyncio.gather(*agent._inbox_workers)
+
+    asyncio.run(run())
+    assert claude.messages.calls == 2  # one model turn for both messages
+    assert "message a2\n\nmessage a3" in claude.messages.prompts[-1]
+    assert registry.deleted == ["a1", "a2", "a3"]
+    assert agent.inbox_stats()["deferred"] == 0
+
+
+def test_losing_the_lease_stops_queued_work(tmp_path):
+    inbox = [msg(f"m{i}", f"sender{i}", timestamp=i) for i in range(6)]
+    agent, _, registry = make_agent(inbox, concurrency=2)
+    agent.claude = StubClaude(latency=0.3)
+    agent.last_scan = datetime.now()  # no landscape scan
+    lease = Lease(tmp_path / "lease.db", ttl=0.3, owner="w1")
+
+    async def run():
+        task = asyncio.create_task(lead(lease, agent._loop))
+        await asyncio.sleep(0.1)
+        assert agent.inbox_stats()["in_flight"] == 2
+
+        # Another worker takes the lease over
+        with sqlite3.connect(tmp_path / "lease.db") as db:
+            db.execute("UPDATE leases SET owner = 'w2', expires_at = ?", (time.time() + 60,))
+        await asyncio.sleep(0.2)
+        assert not lease.held
+        assert not agent._inbox_workers
+        assert agent.inbox_stats()["queue_depth"] == 0
+        assert agent.inbox_stats()["in_flight"] == 0
+        assert not agent._queued_ids
+
+        await asyncio.sleep(0.5)  # nothing left to finish in the background
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert registry.deleted == []
+    assert len(registry.inbox) == 6  # left for the new leader
+    lease.close()
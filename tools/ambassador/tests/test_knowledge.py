@@ -0,0 +1,95 @@
+"""Knowledge base loading and hot-reload tests."""
+
+import asyncio
+import os
+import time
+
+from knowledge import KnowledgeBase, get_knowledge_base, split_sections
+
+
+def touch(path, text):
+    path.write_text(text)
+    later = time.time_ns() + 10**9
+    os.utime(path, ns=(later, later))
+
+
+def test_reload_only_changed_files(tmp_path):
+    (tmp_path / "spec").mkdir()
+    (tmp_path / "faq").mkdir()
+    (tmp_path / "spec" / "SPEC.md").write_text("spec v1")
+    (tmp_path / "faq" / "FAQ.md").write_text("faq v1")
+
+    kb = KnowledgeBase(tmp_path)
+    assert kb.read_topic("spec") == "spec v1"
+    assert kb.read_topic("unknown") == "spec v1"
+    assert kb.read("faq/FAQ.md") == "faq v1"
+    assert not kb.reload()
+
+    faq = kb.read("faq/FAQ.md")
+    touch(tmp_path / "spec" / "SPEC.md", "spec v2")
+    generation = kb.generation
+    assert kb.reload()
+    assert kb.generation == generation + 1
+    assert kb.read_topic("spec") == "spec v2"
+    assert kb.read("faq/FAQ.md") is faq  # untouched file was not re-read
+
+    (tmp_path / "faq" / "FAQ.md").unlink()
+    assert kb.reload()
+    assert kb.read("faq/FAQ.md") is None
+
+
+def test_unreadable_files_are_skipped(tmp_path):
+    (tmp_path / "spec").mkdir()
+    (tmp_path / "spec" / "SPEC.md").write_text("spec v1")
+    (tmp_path / "spec" / "logo.png").write_bytes(b"\x89PNG\xff\xfe")
+
+    kb = KnowledgeBase(tmp_path)
+    assert kb.read("spec/SPEC.md") == "spec v1"
+    assert kb.read("spec/logo.png") is None
+    assert not kb.reload()  # not retried until it changes
+
+
+def test_watcher_survives_a_failing_reload(tmp_path):
+    kb = KnowledgeBase(tmp_path)
+    calls = []
+
+    def reload():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk went away")
+        return False
+
+    kb.reload = reload
+
+    async def run():
+        kb.start_watching(interval=0.01)
+        await asyncio.sleep(0.1)
+        alive = not kb._watcher.done()
+        kb._watcher.cancel()
+        return alive
+
+    assert asyncio.run(run())
+    assert len(calls) > 1
+
+
+def test_shared_instance_covers_repo_topics():
+    kb = get_knowledge_base()
+    assert kb is get_knowledge_base()
+    for topic in ("spec", "python", "typescript", "mcp", "vs_a2a", "vs_ucp", "faq", "spirit"):
+        assert kb.read_topic(topic)
+
+
+def test_split_sections_ignores_code_fences():
+    text = "# Guide\nintro\n## Install\n```bash\n# not a heading\npip install airc\n```\n## Send\nsend()\n"
+    sections = split_sections("guide.md", text)
+    assert [s.heading for s in sections] == ["Guide", "Guide > Install", "Guide > Send"]
+    assert "# not a heading" in sections[1].text
+
+
+def test_search_returns_matching_sections():
+    kb = get_knowledge_base()
+    top = kb.search("consent flow", k=2)
+    assert len(top) == 2
+    assert top[0].path == "spec/SPEC.md" and "Consent Flow" in top[0].heading
+    assert kb.search("vs A2A")[0].path == "comparison/VS_A2A.md"
+    assert kb.search("zzzz-no-such-term") == []
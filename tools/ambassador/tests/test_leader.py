@@ -0,0 +1,61 @@
+"""Agent-loop lease and failover tests."""
+
+import asyncio
+import time
+
+from leader import Lease, lead
+
+
+def test_one_holder_at_a_time(tmp_path):
+    db = tmp_path / "lease.db"
+    a = Lease(db, ttl=0.2, owner="a")
+    b = Lease(db, ttl=0.2, owner="b")
+
+    assert a.try_acquire()
+    assert a.try_acquire()  # renewal
+    assert not b.try_acquire()
+    assert b.holder()["owner"] == "a"
+
+    a.release()
+    assert b.try_acquire()
+
+    time.sleep(0.25)  # b died without releasing
+    assert a.try_acquire()
+    assert not b.try_acquire()
+    assert b.stats()["role"] == "follower"
+
+
+def test_failover_when_the_leader_stops(tmp_path):
+    db = tmp_path / "lease.db"
+    running: list[str] = []
+    log: list[tuple[str, str]] = []
+
+    def worker(name: str):
+        async def work():
+            running.append(name)
+            log.append(("start", name))
+            try:
+                await asyncio.sleep(60)
+            finally:
+                running.remove(name)
+        return work
+
+    async def run():
+        leases = {name: Lease(db, ttl=0.3, owner=name) for name in ("w1", "w2", "w3")}
+        tasks = {name: asyncio.create_task(lead(lease, worker(name))) for name, lease in leases.items()}
+
+        await asyncio.sleep(0.2)
+        assert len(running) == 1
+        first = running[0]
+
+        tasks[first].cancel()  # clean shutdown releases the lease
+        await asyncio.gather(tasks[first], return_exceptions=True)
+        await asyncio.sleep(0.3)
+        assert len(running) == 1 and running[0] != first
+
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    asyncio.run(run())
+    assert len([event for event in log if event[0] == "start"]) == 2
@@ -0,0 +1,120 @@
+"""SQLite memory store tests."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+import httpx
+
+import server
+from agent import AmbassadorAgent
+from memory_store import MemoryStore, public_record
+from stubs import StubClaude
+
+
+def test_remember_and_recall(tmp_path):
+    store = MemoryStore(tmp_path / "memory.db", legacy_json=None)
+
+    async def run():
+        assert await store.get("alice") is None
+        await asyncio.gather(*[store.remember("alice", f"note {i}") for i in range(20)])
+        await store.put("bob", {"notes": "hi", "relationship": "new"})
+        return await store.get("alice"), await store.contains("bob")
+
+    alice, has_bob = asyncio.run(run())
+    assert has_bob
+    assert len(alice["notes"].splitlines()) == 20  # no lost updates
+    assert alice["last_interaction"]
+
+
+def test_imports_memory_json_once(tmp_path):
+    legacy = tmp_path / "memory.json"
+    legacy.write_text(json.dumps({"solienne": {"notes": "be patient"}}))
+    db = tmp_path / "memory.db"
+
+    store = MemoryStore(db, legacy_json=legacy)
+    assert asyncio.run(store.get("solienne"))["notes"] == "be patient"
+    asyncio.run(store.remember("solienne", "follow-up"))
+    store.close()
+
+    # Reopening must not re-import over newer data
+    legacy.write_text(json.dumps({"solienne": {"notes": "stale"}, "new": {"notes": "x"}}))
+    store = MemoryStore(db, legacy_json=legacy)
+    assert "follow-up" in asyncio.run(store.get("solienne"))["notes"]
+    assert asyncio.run(store.get("new")) is None
+
+
+def test_notes_stay_within_budget(tmp_path):
+    store = MemoryStore(tmp_path / "memory.db", legacy_json=None, keep_notes=3, max_note_chars=300)
+
+    async def run():
+        for i in range(40):
+            record = await store.remember("chatty", f"note number {i} " + "x" * 20)
+        return record, await store.note_stats()
+
+    record, stats = asyncio.run(run())
+    assert len(record["recent_notes"]) == 3
+    assert record["recent_notes"][-1].endswith("note number 39 " + "x" * 20)
+    assert record["summary_pending"]
+    assert record["notes"].startswith("Summary: ")
+    assert len(record["notes"]) <= 300
+    assert stats["largest"]["chatty"] == len(record["notes"]) == stats["max_chars"]
+
+    # A model-written summary replaces the folded notes it was based on
+    asyncio.run(store.set_summary("chatty", "Sends many notes.", replaces=record["summary"]))
+    record = asyncio.run(store.get("chatty"))
+    assert record["summary"] == "Sends many notes."
+    assert "summary_pending" not in record
+    assert "recent_notes" not in public_record(record)
+
+
+def test_workers_opening_a_legacy_database_at_once(tmp_path):
+    db = tmp_path / "memory.db"
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            "CREATE TABLE memory (handle TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+
+    errors = []
+    start = threading.Barrier(4)
+
+    def open_store():
+        start.wait()
+        try:
+            MemoryStore(db, legacy_json=None)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with sqlite3.connect(db) as conn:
+        assert "notes_chars" in {row[1] for row in conn.execute("PRAGMA table_info(memory)")}
+
+
+def test_health_probes_reuse_note_stats(monkeypatch):
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=0))
+    monkeypatch.setattr(server, "ambassador", agent)
+    monkeypatch.setattr(server, "_memory_stats_memo", (0.0, {}))
+    scans = []
+    note_stats = agent.memory.note_stats
+
+    async def counted():
+        scans.append(1)
+        return await note_stats()
+
+    agent.memory.note_stats = counted
+
+    async def probe():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [(await client.get("/health")).json() for _ in range(5)]
+
+    responses = asyncio.run(probe())
+    assert len(scans) == 1
+    assert all(r["memory"]["budget_chars"] == agent.memory.max_note_chars for r in responses)
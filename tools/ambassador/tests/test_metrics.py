@@ -0,0 +1,55 @@
+"""Prometheus exposition and /metrics tests."""
+
+import asyncio
+
+import httpx
+
+import server
+from agent import AmbassadorAgent
+from metrics import Counter, Gauge, Histogram, exposition
+from stubs import StubClaude
+
+
+def test_exposition_format():
+    latency = Histogram("demo_seconds", "Demo latency", label="op", buckets=(0.1, 1.0))
+    latency.observe(0.05, "read")
+    latency.observe(0.5, "read")
+    latency.observe(5, "read")
+    errors = Counter("demo_errors_total", "Demo errors", label="op")
+    errors.inc(label='say "hi"')
+    depth = Gauge("demo_depth", "Demo depth", fn=lambda: 3)
+
+    text = exposition([latency, errors, depth])
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{op="read",le="1"} 2' in text
+    assert 'demo_seconds_bucket{op="read",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{op="read"} 3' in text
+    assert 'demo_errors_total{op="say \\"hi\\""} 1' in text
+    assert "demo_depth 3" in text
+
+
+def test_metrics_endpoint_covers_model_tools_and_chat(monkeypatch):
+    claude = StubClaude(latency=0, tool_calls=[("search_knowledge", {"query": "presence"})])
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/api/chat", json={"message": "How does presence work?"})
+            return await client.get("/metrics")
+
+    resp = asyncio.run(run())
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+
+    assert 'ambassador_model_call_seconds_count{mode="create"} 2' in text
+    assert 'ambassador_model_call_tokens_count{kind="input"} 2' in text
+    assert 'ambassador_tool_seconds_count{tool="search_knowledge"} 1' in text
+    assert 'ambassador_chat_request_seconds_count{endpoint="/api/chat"}' in text
+    assert "ambassador_inbox_queue_depth 0" in text
+    assert "# TYPE ambassador_model_calls_rejected_total counter" in text
+    assert 'ambassador_model_calls_rejected_total{priority="web"} 0' in text
+    assert "ambassador_websocket_connections" in text
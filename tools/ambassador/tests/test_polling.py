@@ -0,0 +1,83 @@
+"""Adaptive polling and long-poll tests."""
+
+import asyncio
+import time
+
+import httpx
+
+from agent import AmbassadorAgent
+from registry import RegistryClient
+from polling import AdaptivePoll
+from stubs import StubClaude
+
+
+def test_backoff_schedule():
+    poll = AdaptivePoll(fast=1, idle_max=30, jitter=0, error_base=5, error_max=60)
+
+    assert [poll.next_delay(0) for _ in range(6)] == [2, 4, 8, 16, 30, 30]
+    assert poll.next_delay(3) == 1  # traffic: straight back to fast
+    assert poll.next_delay(0) == 2
+
+    assert [poll.next_delay(None) for _ in range(5)] == [5, 10, 20, 40, 60]
+    assert poll.next_delay(0) == 4  # errors reset, idle streak continues
+
+
+def test_long_streaks_stay_at_the_ceiling():
+    poll = AdaptivePoll(fast=1, idle_max=30, jitter=0, error_base=5, error_max=300)
+
+    # A quiet night at 30s per poll, then a long outage
+    assert max(poll.next_delay(0) for _ in range(5000)) == 30
+    assert poll.next_delay(0) == 30
+    assert max(poll.next_delay(None) for _ in range(5000)) == 300
+    assert poll.next_delay(None) == 300
+    assert poll.next_delay(1) == 1
+
+
+def test_jitter_stays_in_bounds():
+    poll = AdaptivePoll(fast=1, jitter=0.2)
+    delays = [poll.next_delay(1) for _ in range(200)]
+    assert all(0.8 <= d <= 1.2 for d in delays)
+    assert len(set(delays)) > 1
+
+
+class LongPollRegistry:
+    """Holds inbox requests with ?wait= open until a message arrives."""
+
+    def __init__(self):
+        self.inbox = []
+        self.arrived = asyncio.Event()
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/messages" and request.method == "GET":
+            wait = float(request.url.params.get("wait", 0))
+            if not self.inbox and wait:
+                try:
+                    await asyncio.wait_for(self.arrived.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            return httpx.Response(200, json={"inbox": self.inbox})
+        return httpx.Response(200, json={})
+
+
+def test_long_poll_returns_as_soon_as_a_message_arrives(monkeypatch):
+    monkeypatch.setenv("AMBASSADOR_LONG_POLL", "5")
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=0))
+
+    async def run():
+        registry = LongPollRegistry()
+        agent.http = RegistryClient(transport=httpx.MockTransport(registry.handler))
+
+        async def deliver():
+            await asyncio.sleep(0.1)
+            registry.inbox.append({"id": "m1", "from": "alice", "text": "hi", "timestamp": 1})
+            registry.arrived.set()
+
+        start = time.perf_counter()
+        found, _ = await asyncio.gather(agent._process_inbox(), deliver())
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*agent._inbox_workers)
+        return found, elapsed
+
+    found, elapsed = asyncio.run(run())
+    assert found == 1
+    assert 0.1 <= elapsed < 1
@@ -0,0 +1,69 @@
+"""Presence cache tests."""
+
+import asyncio
+
+import httpx
+
+from agent import AmbassadorAgent
+from registry import RegistryClient
+from stubs import StubClaude
+
+
+class PresenceRegistry:
+    def __init__(self):
+        self.requests = []
+        self.etag = '"v1"'
+        self.active = [{"username": "alice"}, {"username": "bob"}]
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(0.05)
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            json={"active": self.active, "systemAccounts": [{"username": "ambassador"}]},
+            headers={"ETag": self.etag},
+        )
+
+
+def make_agent():
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=0))
+    registry = PresenceRegistry()
+    agent.http = RegistryClient(transport=httpx.MockTransport(registry.handler))
+    return agent, registry
+
+
+def test_concurrent_callers_share_one_fetch():
+    agent, registry = make_agent()
+
+    async def run():
+        return await asyncio.gather(
+            *[agent._tool("who_online", {}) for _ in range(5)],
+            agent._tool("who_online", {"handle": "bob"}),
+            agent._tool("who_online", {"handle": "carol"}),
+        )
+
+    *lists, bob, carol = asyncio.run(run())
+    assert len(registry.requests) == 1
+    assert all(names == ["alice", "bob"] for names in lists)
+    assert bob == {"username": "bob"}
+    assert carol == "@carol is not online"
+
+    # Within the TTL nothing is fetched again
+    asyncio.run(agent._tool("who_online", {}))
+    assert len(registry.requests) == 1
+    assert agent.presence.stats()["shared_fetches"] == 6
+
+
+def test_refresh_is_conditional():
+    agent, registry = make_agent()
+    agent.presence.ttl = 0
+
+    first = asyncio.run(agent.presence.get())
+    second = asyncio.run(agent.presence.get())
+
+    assert registry.requests[1].headers["if-none-match"] == '"v1"'
+    assert second is first  # 304 keeps the parsed snapshot
+    assert agent.presence.stats()["not_modified"] == 1
+    assert "ambassador" in second.by_handle
@@ -0,0 +1,53 @@
+"""Token-bucket rate limiter tests."""
+
+import time
+
+from ratelimit import RateLimiter
+
+
+def test_one_per_interval_per_key():
+    limiter = RateLimiter(interval=0.2)
+
+    assert limiter.allowed("alice")
+    limiter.hit("alice")
+    assert not limiter.allowed("alice")
+    assert 0.1 < limiter.retry_after("alice") <= 0.2
+    assert limiter.allowed("bob")  # other senders are unaffected
+
+    time.sleep(0.25)
+    assert limiter.allowed("alice")
+    assert limiter.retry_after("alice") == 0
+
+
+def test_global_limit_applies_across_keys():
+    limiter = RateLimiter(interval=60, global_interval=0.2, global_burst=2)
+
+    limiter.hit("a")
+    limiter.hit("b")
+    assert not limiter.allowed("c")
+    assert limiter.retry_after("c") > 0
+
+    time.sleep(0.25)
+    assert limiter.allowed("c")
+    assert not limiter.allowed("a")
+
+
+def test_memory_stays_bounded():
+    limiter = RateLimiter(interval=60, max_keys=100)
+    for i in range(1000):
+        limiter.hit(f"agent-{i}")
+
+    assert len(limiter) == 100
+    assert limiter.stats()["evicted"] == 900
+    assert not limiter.allowed("agent-999")
+
+
+def test_refilled_buckets_expire():
+    limiter = RateLimiter(interval=0.05)
+    for i in range(50):
+        limiter.hit(f"agent-{i}")
+    assert len(limiter) == 50
+
+    time.sleep(0.1)
+    limiter.hit("late")
+    assert len(limiter) == 1
@@ -0,0 +1,67 @@
+"""Registry client retry and latency tests."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from registry import RegistryClient
+
+
+def flaky(failures: int, status: int = 503):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if len(calls) <= failures:
+            return httpx.Response(status)
+        return httpx.Response(200, json={"ok": True})
+
+    return handler, calls
+
+
+def client_for(handler, retries: int = 3) -> RegistryClient:
+    client = RegistryClient(transport=httpx.MockTransport(handler), retries=retries)
+    client.backoff_base = 0.001
+    return client
+
+
+def test_idempotent_calls_retry_transient_failures():
+    handler, calls = flaky(2)
+    client = client_for(handler)
+
+    resp = asyncio.run(client.get("http://registry.test/api/messages", params={"user": "a"}))
+
+    assert resp.status_code == 200
+    assert len(calls) == 3
+    stats = client.stats()["GET /api/messages"]
+    assert stats["count"] == 3 and stats["retries"] == 2
+
+
+def test_message_sends_are_not_retried():
+    handler, calls = flaky(1)
+    client = client_for(handler)
+
+    resp = asyncio.run(client.post("http://registry.test/api/messages", json={"text": "hi"}))
+    assert resp.status_code == 503
+    assert len(calls) == 1
+
+    # Heartbeats opt in: repeating them is harmless
+    handler, calls = flaky(1)
+    client = client_for(handler)
+    resp = asyncio.run(client.post("http://registry.test/api/presence", idempotent=True, json={}))
+    assert resp.status_code == 200 and len(calls) == 2
+
+
+def test_connection_errors_give_up_after_retries():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    client = client_for(handler, retries=2)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(client.post("http://registry.test/api/messages", json={}))
+    assert len(attempts) == 3  # never reached the registry, so safe to resend
+    assert client.stats()["POST /api/messages"]["errors"] == 3
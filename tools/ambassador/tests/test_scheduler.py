@@ -0,0 +1,106 @@
+"""Model-call admission control and priority tests."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from agent import AmbassadorAgent
+from scheduler import Busy, ModelScheduler
+from stubs import StubClaude
+
+
+def test_freed_slots_go_to_higher_priority_first():
+    scheduler = ModelScheduler(max_concurrent=1, reserved=0)
+    order = []
+
+    async def call(priority: str, name: str):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await scheduler.acquire("inbox")
+        tasks = [asyncio.create_task(call(p, n)) for p, n in
+                 [("web", "web1"), ("background", "bg"), ("web", "web2"), ("inbox", "inbox1")]]
+        await asyncio.sleep(0.01)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["inbox1", "web1", "web2", "bg"]
+
+
+def test_reserved_slot_keeps_inbox_moving():
+    scheduler = ModelScheduler(max_concurrent=2, reserved=1, max_wait={"web": 0.05})
+
+    async def run():
+        await scheduler.acquire("web")
+        with pytest.raises(Busy):
+            await scheduler.acquire("web")  # the last slot is the inbox's
+        await asyncio.wait_for(scheduler.acquire("inbox"), 0.1)
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["active"] == 2
+    assert stats["rejected"]["web"] == 1
+    assert stats["waiting"]["web"] == 0
+
+
+def test_full_queue_rejects_immediately():
+    scheduler = ModelScheduler(max_concurrent=1, reserved=0, queue_limits={"web": 1})
+
+    async def run():
+        await scheduler.acquire("web")
+        waiter = asyncio.create_task(scheduler.acquire("web"))
+        await asyncio.sleep(0)
+        with pytest.raises(Busy) as busy:
+            await scheduler.acquire("web")
+        # Inbox is never rejected, it just queues
+        inbox = asyncio.create_task(scheduler.acquire("inbox", reject=False))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await inbox
+        assert not waiter.done()
+        waiter.cancel()
+        return busy.value.retry_after
+
+    assert asyncio.run(run()) >= 1
+
+
+def saturated_agent() -> AmbassadorAgent:
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=0))
+    agent.scheduler = ModelScheduler(max_concurrent=1, reserved=0, queue_limits={"web": 0})
+    asyncio.run(agent.scheduler.acquire("inbox"))  # an inbox reply holds the only slot
+    return agent
+
+
+def test_api_chat_sheds_load_with_429(monkeypatch):
+    agent = saturated_agent()
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/chat", json={"message": "What is AIRC?"})
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+    assert agent.claude.messages.calls == 0
+
+
+def test_websocket_gets_a_busy_frame(monkeypatch):
+    agent = saturated_agent()
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    client = TestClient(server.app)
+    with client.websocket_connect("/ws/chat") as ws:
+        ws.receive_json()  # welcome
+        for stream in (False, True):
+            ws.send_json({"message": "What is AIRC?", "stream": stream})
+            frame = ws.receive_json()
+            assert frame["type"] == "busy"
+            assert frame["retry_after"] >= 1 and frame["body"]
@@ -0,0 +1,151 @@
+"""Shared-state backend tests: what one worker writes, the others see."""
+
+import asyncio
+import time
+
+import pytest
+
+from answer_cache import AnswerCache
+from knowledge import KnowledgeBase
+from ratelimit import RateLimiter
+from shared_state import MemoryState, SQLiteState, flush_writes, open_state, shared_set
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def state(request, tmp_path):
+    backend = SQLiteState(tmp_path / "state.db") if request.param == "sqlite" else MemoryState()
+    yield backend
+    backend.close()
+
+
+def test_kv_and_ttl(state):
+    state.set("ns", "a", "A")
+    state.set("ns", "b", "B", ttl=-1)
+    assert state.get("ns", "a") == "A"
+    assert state.get("ns", "b") is None  # already expired
+    assert state.get("other", "a") is None
+
+    state.delete("ns", "a")
+    assert state.get("ns", "a") is None
+
+
+def test_log_is_newest_first_and_capped(state):
+    for i in range(5):
+        state.append("feed", str(i), keep=3)
+    assert state.recent("feed", 10) == ["4", "3", "2"]
+    assert state.recent("feed", 2) == ["4", "3"]
+    assert state.count("feed") == 3
+
+    state.clear("feed")
+    assert state.count("feed") == 0
+
+
+def test_sqlite_is_shared_between_connections(tmp_path):
+    one, two = SQLiteState(tmp_path / "state.db"), SQLiteState(tmp_path / "state.db")
+    try:
+        one.append("feed", "hello", keep=20)
+        one.set("answers", "k", "v", ttl=60)
+        assert two.recent("feed", 10) == ["hello"]
+        assert two.get("answers", "k") == "v"
+    finally:
+        one.close()
+        two.close()
+
+
+def test_open_state_backends(tmp_path, monkeypatch):
+    monkeypatch.setenv("AMBASSADOR_STATE", "memory")
+    assert isinstance(open_state(tmp_path / "x.db"), MemoryState)
+
+    monkeypatch.setenv("AMBASSADOR_STATE", "sqlite")
+    monkeypatch.setenv("AMBASSADOR_STATE_DB", str(tmp_path / "state.db"))
+    backend = open_state(tmp_path / "x.db")
+    assert backend.path == tmp_path / "state.db"
+    backend.close()
+
+    monkeypatch.setenv("AMBASSADOR_STATE", "redis")
+    with pytest.raises(ValueError):
+        open_state(tmp_path / "x.db")
+
+
+def test_answer_cache_shared_between_workers(tmp_path):
+    docs = tmp_path / "knowledge"
+    doc = docs / "faq" / "FAQ.md"
+    doc.parent.mkdir(parents=True)
+    doc.write_text("v1")
+    state = SQLiteState(tmp_path / "state.db")
+    first = AnswerCache(KnowledgeBase(docs), state=state)
+    second = AnswerCache(KnowledgeBase(docs), state=state)
+
+    first.put("What is AIRC?", "v1 answer")
+    assert second.get("what is airc") is None  # get() never leaves the process
+    assert asyncio.run(second.fetch("what is airc")) == "v1 answer"
+    assert second.stats()["shared_hits"] == 1
+    assert second.get("what is airc") == "v1 answer"  # now served locally
+    assert second.stats()["shared_hits"] == 1
+
+    # New knowledge, new fingerprint: the old shared answer is unreachable
+    time.sleep(0.01)
+    doc.write_text("v2")
+    third = AnswerCache(KnowledgeBase(docs), state=state)
+    assert asyncio.run(third.fetch("What is AIRC?")) is None
+    state.close()
+
+
+def test_rate_limit_survives_a_new_worker(tmp_path):
+    state = SQLiteState(tmp_path / "state.db")
+    RateLimiter(interval=60, state=state, namespace="reply").hit("alice")
+
+    limiter = RateLimiter(interval=60, state=state, namespace="reply")
+    other = RateLimiter(interval=60, state=state, namespace="other")
+
+    async def load():
+        for key in ("alice", "bob"):
+            await limiter.load(key)
+        await other.load("alice")
+
+    asyncio.run(load())
+    assert not limiter.allowed("alice")
+    assert 55 < limiter.retry_after("alice") <= 60
+    assert limiter.allowed("bob")
+    assert other.allowed("alice")
+    state.close()
+
+
+class BrokenState:
+    """A store whose every call fails, like SQLite locked past its timeout."""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise RuntimeError("database is locked")
+        return fail
+
+
+def test_store_errors_never_fail_callers(tmp_path):
+    cache = AnswerCache(KnowledgeBase(tmp_path), state=BrokenState())
+    limiter = RateLimiter(interval=60, state=BrokenState())
+
+    async def run():
+        cache.put("What is AIRC?", "answer")
+        limiter.hit("alice")
+        await limiter.load("bob")
+        await asyncio.sleep(0.05)  # let background writes fail
+        return await cache.fetch("What is AIRC?"), await cache.fetch("Something else?")
+
+    assert asyncio.run(run()) == ("answer", None)
+    assert not limiter.allowed("alice")
+    assert limiter.allowed("bob")
+
+
+def test_flush_waits_for_background_writes(tmp_path):
+    state = SQLiteState(tmp_path / "state.db")
+
+    async def run():
+        for i in range(50):
+            shared_set(state, "answers", f"q{i}", f"a{i}")
+        await flush_writes()
+        state.close()  # nothing left to write to a closed database
+
+    asyncio.run(run())
+    reopened = SQLiteState(tmp_path / "state.db")
+    assert reopened.get("answers", "q49") == "a49"
+    reopened.close()
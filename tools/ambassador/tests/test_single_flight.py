@@ -0,0 +1,105 @@
+"""Single-flight coalescing of identical in-flight chat questions."""
+
+import asyncio
+
+import pytest
+
+from agent import AmbassadorAgent, handle_web_chat
+from single_flight import SingleFlight
+from stubs import StubClaude
+
+
+def make_agent(latency: float = 0.2):
+    claude = StubClaude(latency=latency)
+    return AmbassadorAgent(registry="http://registry.test", claude=claude), claude
+
+
+def test_identical_questions_share_one_run():
+    agent, claude = make_agent()
+    variants = ["What is AIRC?", "what is airc", "What is AIRC ?!"] * 7
+
+    async def run():
+        return await asyncio.gather(*(handle_web_chat(q, agent) for q in variants))
+
+    answers = asyncio.run(run())
+
+    assert claude.messages.calls == 1
+    assert set(answers) == {claude.messages.reply}
+    assert agent.chat_flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 20}
+
+
+def test_questions_without_words_are_not_coalesced():
+    agent, claude = make_agent()
+
+    async def run():
+        return await asyncio.gather(handle_web_chat("👋", agent), handle_web_chat("🤔", agent))
+
+    asyncio.run(run())
+    assert claude.messages.calls == 2
+    assert agent.chat_flights.stats()["started"] == 0
+
+
+def test_streaming_follower_gets_leaders_deltas():
+    agent, claude = make_agent(latency=0.3)
+    leader, follower, plain = [], [], []
+
+    def collect(into):
+        async def on_delta(text):
+            into.append(text)
+        return on_delta
+
+    async def run():
+        first = asyncio.create_task(handle_web_chat("What is AIRC?", agent, on_delta=collect(leader)))
+        await asyncio.sleep(0.15)  # join mid-stream
+        second = asyncio.create_task(handle_web_chat("what is AIRC", agent, on_delta=collect(follower)))
+        third = asyncio.create_task(handle_web_chat("What is AIRC", agent))
+        return await asyncio.gather(first, second, third)
+
+    answers = asyncio.run(run())
+
+    assert claude.messages.calls == 1
+    assert "".join(leader) == "".join(follower) == claude.messages.reply
+    assert len(follower) > 1
+    assert set(answers) == {claude.messages.reply}
+
+
+def test_run_survives_the_leader_leaving():
+    agent, claude = make_agent()
+
+    async def run():
+        leader = asyncio.create_task(handle_web_chat("What is AIRC?", agent))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(handle_web_chat("What is AIRC?", agent))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == claude.messages.reply
+    assert claude.messages.calls == 1
+
+
+def test_run_is_cancelled_when_everyone_leaves():
+    flight = SingleFlight()
+
+    async def run():
+        started = asyncio.Event()
+        stopped = asyncio.Event()
+
+        async def compute(on_delta):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        callers = [asyncio.create_task(flight.run("q", compute)) for _ in range(3)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await callers[0]
+        await asyncio.wait_for(stopped.wait(), 1)
+        return flight.stats()
+
+    assert asyncio.run(run())["in_flight"] == 0
@@ -0,0 +1,64 @@
+"""Streaming chat tests for /api/chat/stream and /ws/chat."""
+
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+import server
+from agent import AmbassadorAgent
+from stubs import StubClaude
+
+
+def parse_sse(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for chunk in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in chunk.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_sse_streams_deltas_then_done(monkeypatch):
+    claude = StubClaude(latency=0.2)
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/chat/stream", json={"message": "What is AIRC?"})
+
+    resp = asyncio.run(run())
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_sse(resp.text)
+    deltas = [data["delta"] for event, data in events if event == "delta"]
+    event, done = events[-1]
+
+    assert len(deltas) > 1
+    assert event == "done"
+    assert "".join(deltas) == done["body"] == claude.messages.reply
+    assert done["ttft_ms"] < done["total_ms"]
+
+
+def test_websocket_stream_opt_in(monkeypatch):
+    agent = AmbassadorAgent(registry="http://registry.test", claude=StubClaude(latency=0.05))
+    monkeypatch.setattr(server, "ambassador", agent)
+
+    # Bypass lifespan so no agent loop talks to the real registry
+    client = TestClient(server.app)
+    with client.websocket_connect("/ws/chat") as ws:
+        assert "body" in ws.receive_json()  # welcome
+
+        ws.send_json({"message": "hi"})
+        plain = ws.receive_json()
+        assert "type" not in plain and plain["body"]
+
+        ws.send_json({"message": "hi", "stream": True})
+        frames = []
+        while not frames or frames[-1]["type"] != "done":
+            frames.append(ws.receive_json())
+
+    assert {f["type"] for f in frames[:-1]} == {"delta"}
+    assert frames[-1]["body"] == plain["body"]
@@ -0,0 +1,78 @@
+"""Parallel tool execution tests."""
+
+import asyncio
+import time
+
+from agent import AmbassadorAgent
+from stubs import StubClaude
+
+
+def test_tools_of_one_turn_run_concurrently_in_order():
+    claude = StubClaude(latency=0, tool_calls=[
+        ("recall", {"handle": "alice"}),
+        ("who_online", {}),
+        ("read_knowledge", {"topic": "faq"}),
+        ("search_knowledge", {"query": "presence"}),
+    ])
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+    agent.TOOL_TIMEOUTS = {"who_online": 0.1}
+    agent.tool_timeout = 1
+
+    async def fake_tool(name, input):
+        if name == "who_online":
+            await asyncio.sleep(5)  # registry hangs
+        if name == "read_knowledge":
+            raise RuntimeError("disk on fire")
+        await asyncio.sleep(0.2)
+        return f"{name} ok"
+
+    agent._tool = fake_tool
+
+    start = time.perf_counter()
+    answer = asyncio.run(agent._run_agent("Who is around?"))
+    elapsed = time.perf_counter() - start
+
+    assert answer == claude.messages.reply
+    assert elapsed < 0.4  # not 0.2 * 3 + the timeout
+
+    results = claude.messages.requests[1]["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in results] == ["toolu_0", "toolu_1", "toolu_2", "toolu_3"]
+    assert results[0]["content"] == "recall ok" and "is_error" not in results[0]
+    assert results[1]["is_error"] and "timed out" in results[1]["content"]
+    assert results[2]["is_error"] and "disk on fire" in results[2]["content"]
+    assert results[3]["content"] == "search_knowledge ok"
+
+
+def test_side_effecting_tools_run_one_at_a_time_in_order():
+    claude = StubClaude(latency=0, tool_calls=[
+        ("send_message", {"to": "alice", "body": "first"}),
+        ("send_message", {"to": "alice", "body": "second"}),
+        ("search_knowledge", {"query": "presence"}),
+        ("remember", {"handle": "alice", "note": "likes presence"}),
+        ("recall", {"handle": "alice"}),
+        ("who_online", {}),
+    ])
+    agent = AmbassadorAgent(registry="http://registry.test", claude=claude)
+    events = []
+
+    async def fake_tool(name, input):
+        events.append(("start", name))
+        # Later calls finish first if they are allowed to overlap
+        await asyncio.sleep(0.1 if input.get("body") == "first" else 0.01)
+        events.append(("end", name))
+        return f"{name} ok"
+
+    agent._tool = fake_tool
+    asyncio.run(agent._run_agent("Say hi to alice"))
+
+    assert events == [
+        ("start", "send_message"), ("end", "send_message"),
+        ("start", "send_message"), ("end", "send_message"),
+        ("start", "search_knowledge"), ("end", "search_knowledge"),
+        ("start", "remember"), ("end", "remember"),
+        # Lookups after the last side effect still run together
+        ("start", "recall"), ("start", "who_online"),
+        ("end", "recall"), ("end", "who_online"),
+    ]
+    results = claude.messages.requests[1]["messages"][-1]["content"]
+    assert [r["tool_use_id"] for r in results] == [f"toolu_{i}" for i in range(6)]
@@ -0,0 +1,91 @@
+"""Span tree and export tests."""
+
+import asyncio
+import json
+
+import httpx
+
+from stubs import StubClaude
+from test_inbox import make_agent, msg
+from tracing import JsonlExporter, OtlpExporter, Tracer
+
+
+def test_inbox_message_span_tree(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    agent, claude, _ = make_agent([msg("m1", "alice")])
+    agent.claude = claude = StubClaude(latency=0, tool_calls=[("search_knowledge", {"query": "presence"})])
+    agent.tracer = Tracer(JsonlExporter(str(path)))
+
+    async def run():
+        await agent._process_inbox()
+        await asyncio.gather(*agent._inbox_workers)
+        await agent.tracer.aclose()
+
+    asyncio.run(run())
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    by_id = {s["span_id"]: s for s in spans}
+
+    def parent(name):
+        span = next(s for s in spans if s["name"] == name)
+        return by_id[span["parent_id"]]["name"] if span["parent_id"] else None
+
+    assert len({s["trace_id"] for s in spans}) == 1
+    assert parent("inbox.fetch") is None
+    assert parent("inbox.message") == "inbox.fetch"
+    assert parent("handle_message") == "inbox.message"
+    assert parent("agent.run") == "handle_message"
+    assert parent("model.call") == "agent.run"
+    assert parent("tool.search_knowledge") == "agent.run"
+    assert parent("send") == "handle_message"
+    assert parent("delete_message") == "inbox.message"
+    assert [s["attributes"]["stop_reason"] for s in spans if s["name"] == "model.call"] == ["tool_use", "end_turn"]
+
+    # Tracing must not change what the model is sent
+    prompt = claude.messages.prompts[0]
+    assert prompt.startswith("Message from @alice:\n\n\"")
+    assert not any(line.startswith(" ") for line in prompt.splitlines())
+
+
+def test_idle_polls_are_not_exported(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    agent, _, _ = make_agent([])
+    agent.tracer = Tracer(JsonlExporter(str(path)))
+
+    asyncio.run(agent._process_inbox())
+    assert path.read_text() == ""
+
+
+def test_otlp_export_batches_spans():
+    received = []
+
+    def collector(request: httpx.Request) -> httpx.Response:
+        received.append(json.loads(request.content))
+        return httpx.Response(200, json={})
+
+    exporter = OtlpExporter("http://localhost:4318", flush_interval=0.01,
+                            transport=httpx.MockTransport(collector))
+    tracer = Tracer(exporter)
+
+    async def run():
+        with tracer.span("outer", sender="alice"):
+            with tracer.span("inner", iteration=1):
+                pass
+        await asyncio.sleep(0.05)
+        await tracer.aclose()
+
+    asyncio.run(run())
+
+    assert len(received) == 1
+    spans = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    inner, outer = spans
+    assert inner["parentSpanId"] == outer["spanId"]
+    assert inner["attributes"] == [{"key": "iteration", "value": {"intValue": "1"}}]
+    assert outer["status"] == {"code": 1}
+
+
+def test_disabled_tracer_is_a_no_op():
+    tracer = Tracer()
+    with tracer.span("anything") as span:
+        assert span is None
+    assert not tracer.enabled
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+AIRC Ambassador Tracing
+
+Opt-in span trees for inbox handling: fetch → message → model calls and
+tools → send → delete. Off unless AMBASSADOR_TRACE is set:
+- a file path writes one JSON object per finished span (JSON lines)
+- an http(s) URL posts batches to an OTLP/HTTP collector, e.g.
+  http://localhost:4318 (the /v1/traces path is added if missing)
+
+The current span lives in a contextvar, so children started in the same
+task, or in tasks created inside it, find their parent automatically.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import httpx
+
+
+SERVICE_NAME = "airc-ambassador"
+
+_current: ContextVar[Optional["Span"]] = ContextVar("ambassador_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    discarded: bool = False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def discard(self):
+        """Don't export this span (e.g. an inbox poll that found nothing)."""
+        self.discarded = True
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 2),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter.
+
+    Without an exporter every span() is a no-op yielding None, so call
+    sites cost one attribute check when tracing is off.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current.get()
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes) -> Iterator[Optional[Span]]:
+        """Time a block as a child of `parent` (default: the current span)."""
+        if self.exporter is None:
+            yield None
+            return
+
+        parent = parent or _current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            if not span.discarded:
+                self.exporter.export(span)
+
+    async def aclose(self):
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+
+class JsonlExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    async def aclose(self):
+        with self._lock:
+            self._file.close()
+
+
+class OtlpExporter:
+    """Batches finished spans and posts them as OTLP/HTTP JSON."""
+
+    def __init__(self, endpoint: str, flush_interval: float = 2.0, max_batch: int = 256,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        if not endpoint.rstrip("/").endswith("/v1/traces"):
+            endpoint = endpoint.rstrip("/") + "/v1/traces"
+        self.endpoint = endpoint
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: list[Span] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._client = httpx.AsyncClient(timeout=5, transport=transport)
+        self.dropped = 0
+
+    def export(self, span: Span):
+        self._pending.append(span)
+        if len(self._pending) > self.max_batch * 4:
+            # Collector is down or slow: shed the oldest rather than grow
+            drop = len(self._pending) - self.max_batch * 4
+            del self._pending[:drop]
+            self.dropped += drop
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                pass  # No loop (shutdown); flushed by aclose()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            try:
+                await self._client.post(self.endpoint, json=otlp_payload(batch))
+            except httpx.HTTPError as e:
+                self.dropped += len(batch)
+                print(f"Trace export failed: {e}", flush=True)
+
+    async def aclose(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        await self._client.aclose()
+
+
+def otlp_payload(spans: list[Span]) -> dict:
+    """Spans as an OTLP ExportTraceServiceRequest (JSON encoding)."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{
+                "scope": {"name": "ambassador"},
+                "spans": [_otlp_span(span) for span in spans],
+            }],
+        }]
+    }
+
+
+def _otlp_span(span: Span) -> dict:
+    result = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        result["parentSpanId"] = span.parent_id
+    return result
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+def tracer_from_env() -> Tracer:
+    """A Tracer configured by AMBASSADOR_TRACE (disabled if unset)."""
+    target = os.environ.get("AMBASSADOR_TRACE", "").strip()
+    if not target:
+        return Tracer()
+    if target.startswith(("http://", "https://")):
+        return Tracer(OtlpExporter(target))
+    return Tracer(JsonlExporter(target))